@@ -0,0 +1,48 @@
+"""Compare loading the images from the bitmaps (decoding and slicing them) against loading them
+from a baked asset pack, in both the copy and atlas modes, including the conversion to the
+display format.  The pack is baked into a temporary directory, so it doesn't matter whether the
+repository has one.
+
+Run from the repository root (the image paths are relative):
+
+    python -m benchmarks.bench_asset_pack
+"""
+
+import os
+import tempfile
+import timeit
+
+# No window is needed to load images
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+from src.image_resources import ImageResources
+from src.settings import Settings
+
+def load(settings, atlas, asset_pack_path):
+    """Load and convert all images in the given mode, from the pack if there is one"""
+    settings.image_atlas = atlas
+    settings.asset_pack_path = asset_pack_path
+    image_res = ImageResources(settings)
+    image_res.convert_to_display_format()
+    return image_res
+
+def run_benchmark(loads=200):
+    """Print the best load time of the bitmaps and the pack in both modes"""
+    pygame.init()
+    settings = Settings()
+    pygame.display.set_mode((settings.screen_width, settings.screen_height))
+
+    with tempfile.TemporaryDirectory() as pack_dir:
+        asset_pack_path = os.path.join(pack_dir, 'assets.pack')
+        settings.asset_pack_path = None
+        ImageResources(settings).write_asset_pack(asset_pack_path)
+
+        print('{:<8} {:>12} {:>12}'.format('mode', 'bitmaps ms', 'pack ms'))
+        for name, atlas in [('copy', False), ('atlas', True)]:
+            times = [min(timeit.repeat(lambda: load(settings, atlas, path), number=1, repeat=loads)) * 1000
+                for path in (None, asset_pack_path)]
+            print('{:<8} {:>12.3f} {:>12.3f}'.format(name, *times))
+
+if __name__ == '__main__':
+    run_benchmark()
@@ -0,0 +1,73 @@
+"""Compare the sprite atlas (one sheet per image, subsurface views for the frames) against
+copying every frame into its own surface: pixel memory, load time and blit cost.
+
+Run from the repository root (the image paths are relative):
+
+    python -m benchmarks.bench_atlas
+"""
+
+import os
+import timeit
+
+# No window is needed to load and blit images
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+from src.image_resources import ImageResources
+from src.settings import Settings
+
+def get_frame_lists(image_res):
+    """All of the frame lists that are sliced from sheets"""
+    return [image_res.tile_images, image_res.player_sprite_images, image_res.enemy_blob_images,
+        image_res.blob_exit_images, image_res.digit_images, image_res.lcd_digit_images]
+
+def get_pixel_bytes(image_res):
+    """Bytes of pixel data held for the sliced frames, views share their parent's pixels so
+    only count each parent once"""
+    owners = {}
+    for images in get_frame_lists(image_res):
+        for image in images:
+            owner = image.get_parent() or image
+            owners[id(owner)] = owner
+    return sum(owner.get_width() * owner.get_height() * owner.get_bytesize() for owner in owners.values())
+
+def load(settings, atlas):
+    """Load and convert all images in the given mode"""
+    settings.image_atlas = atlas
+    # Always the bitmaps, see bench_asset_pack.py for the baked pack
+    settings.asset_pack_path = None
+    image_res = ImageResources(settings)
+    image_res.convert_to_display_format()
+    return image_res
+
+def time_blits(screen, image_res, repeat):
+    """Microseconds per blit across all the sliced frames"""
+    images = [image for images in get_frame_lists(image_res) for image in images]
+    def blit_all():
+        for image in images:
+            screen.blit(image, (100, 100))
+
+    best = min(timeit.repeat(blit_all, number=repeat, repeat=5))
+    return best / (repeat * len(images)) * 1000000
+
+def run_benchmark(loads=20, repeat=200):
+    """Print the memory, load time and blit cost of both modes"""
+    pygame.init()
+    settings = Settings()
+    screen = pygame.display.set_mode((settings.screen_width, settings.screen_height))
+
+    print('{:<8} {:>12} {:>10} {:>10}'.format('mode', 'pixel bytes', 'load ms', 'blit us'))
+    results = {}
+    for name, atlas in [('copy', False), ('atlas', True)]:
+        load_time = min(timeit.repeat(lambda: load(settings, atlas), number=1, repeat=loads)) * 1000
+        image_res = load(settings, atlas)
+        results[name] = (get_pixel_bytes(image_res), load_time, time_blits(screen, image_res, repeat))
+        print('{:<8} {:>12} {:>10.3f} {:>10.3f}'.format(name, *results[name]))
+
+    saved_bytes = results['copy'][0] - results['atlas'][0]
+    saved_ms = results['copy'][1] - results['atlas'][1]
+    print('atlas saves {} bytes ({:.1f}%) and {:.3f} ms of load time'.format(
+        saved_bytes, saved_bytes * 100.0 / results['copy'][0], saved_ms))
+
+if __name__ == '__main__':
+    run_benchmark()
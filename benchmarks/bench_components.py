@@ -0,0 +1,328 @@
+"""Time the per-frame hot paths one component at a time, on fixtures built from the real
+Settings/ImageResources/Tilemap with a fixed seed, across sweeps of the parameters that
+drive their cost (enemy and particle counts, cached vs rebuilt layers, etc).
+
+Results are written as JSON so two runs can be compared.  Run from the repository root
+(the image paths are relative):
+
+    python -m benchmarks.bench_components --output before.json
+    python -m benchmarks.bench_components --output after.json --compare before.json
+
+With --compare the exit code is 1 if any case got slower than the threshold allows.  Cases are
+compared on their median, and a slowdown only counts if it is also more than --min-delta
+microseconds and the middle halves of the two runs' samples don't overlap (the current lower
+quartile is above the baseline's upper quartile), so noisy and cheap cases don't fail on noise.
+The samples of each case are taken over --rounds passes of the whole suite, so a few seconds of a
+slower machine don't slow every sample of the cases that ran then.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# No window is needed
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+import src.game_functions as gf
+from pyclimber import create_game
+from src.blob_enemy import Blob
+from src.level_builder import LevelBuilder
+from src.level_data import LevelData
+from src.level_pack import LevelPack
+from src.observation_builder import ObservationBuilder
+from src.particle_engine import ParticleEngine
+from src.particle_generator import ParticleGenerator
+from src.settings import Settings
+
+# Seed for the map layout and every fixture's random placements
+fixture_seed = 1
+
+def build_fixture():
+    """A fresh settings, screen and tilemap, the same every time for a given seed"""
+    settings = Settings()
+    settings.rng.seed(fixture_seed)
+    screen, tile_map = create_game(settings)
+    return settings, screen, tile_map
+
+def create_blobs(settings, screen, tile_map, count):
+    """Blobs scattered over the map at seeded random positions, walking either way"""
+    placement = random.Random(fixture_seed)
+    bounds = tile_map.player_bounds_rect
+    blobs = []
+    for index in range(0, count):
+        blob = Blob(settings, screen, settings.image_res.enemy_blob_images)
+        blob.rect.left = placement.randint(bounds.left, bounds.right - blob.rect.width)
+        blob.rect.bottom = placement.randint(bounds.top + blob.rect.height, bounds.bottom)
+        if placement.random() < 0.5:
+            blob.dx = -blob.dx
+            blob.facing_left = True
+        blobs.append(blob)
+    return blobs
+
+def time_case(run, setup=None, repeat=50, number=1):
+    """Time run() number times per sample (after setup(), which isn't timed) and return the
+    per-call times in microseconds"""
+    samples = []
+    for sample in range(0, repeat):
+        if setup:
+            setup()
+        start_time = time.perf_counter()
+        for call in range(0, number):
+            run()
+        samples.append((time.perf_counter() - start_time) / number * 1000000)
+    return samples
+
+def summarize(name, params, samples):
+    """One result record"""
+    samples = sorted(samples)
+    return {
+        'name': name,
+        'params': params,
+        'repeat': len(samples),
+        'min_us': samples[0],
+        'p25_us': samples[int(len(samples) * 0.25)],
+        'median_us': statistics.median(samples),
+        'p75_us': samples[min(len(samples) - 1, int(len(samples) * 0.75))],
+        'mean_us': statistics.mean(samples),
+        'p95_us': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        'samples_us': samples,
+    }
+
+def bench_draw_tiles(repeat):
+    """Tilemap.draw_tiles with the cached layers, and with them rebuilt every call"""
+    settings, screen, tile_map = build_fixture()
+    results = []
+    for cached in (True, False):
+        for grid in (False, True):
+            setup = None if cached else tile_map.invalidate_tile_layer
+            # Warm the cache so the cached case only measures the blits
+            tile_map.draw_tiles(grid)
+            samples = time_case(lambda: tile_map.draw_tiles(grid), setup, repeat, 10 if cached else 1)
+            results.append(summarize('Tilemap.draw_tiles', {'cached': cached, 'grid': grid}, samples))
+    return results
+
+def bench_generate_platforms(repeat):
+    """Tilemap.generate_platforms, including the block grid and block layer rebuild"""
+    settings, screen, tile_map = build_fixture()
+    settings.rng.seed(fixture_seed)
+    samples = time_case(tile_map.generate_platforms, None, repeat)
+    return [summarize('Tilemap.generate_platforms', {'floors': settings.map_number_floors}, samples)]
+
+def bench_level_change(repeat):
+    """Tilemap.change_level with the next level built beforehand (as it is while the player
+    waits at the top), and built in the frame"""
+    settings, screen, tile_map = build_fixture()
+    results = []
+    for prebuilt in (True, False):
+        def setup():
+            tile_map.next_level = None
+            if prebuilt:
+                tile_map.next_level = LevelBuilder(tile_map)
+                tile_map.next_level.finish()
+        samples = time_case(tile_map.change_level, setup, repeat)
+        results.append(summarize('Tilemap.change_level', {'prebuilt': prebuilt}, samples))
+    return results
+
+def bench_level_pack(repeat, count=1000):
+    """LevelPack.get_level from a pack of N levels, and Tilemap.load_level of the level"""
+    settings, screen, tile_map = build_fixture()
+    level = LevelData.from_tile_map(tile_map)
+    with tempfile.TemporaryDirectory() as pack_dir:
+        pack_path = os.path.join(pack_dir, 'levels.pack')
+        LevelPack.write(pack_path, [level] * count)
+        pack = LevelPack(pack_path)
+        samples = time_case(lambda: pack.get_level(count - 1), None, repeat, 10)
+        pack.close()
+    return [
+        summarize('LevelPack.get_level', {'levels': count}, samples),
+        summarize('Tilemap.load_level', {}, time_case(lambda: tile_map.load_level(level), None, repeat)),
+    ]
+
+def bench_blob_block_collision(repeat, counts):
+    """AnimatedSprite.update (via Blob.update) against the block platforms for N blobs"""
+    settings, screen, tile_map = build_fixture()
+    results = []
+    for count in counts:
+        blobs = []
+        def setup():
+            blobs[:] = create_blobs(settings, screen, tile_map, count)
+        def run():
+            for blob in blobs:
+                blob.update(tile_map)
+        results.append(summarize('AnimatedSprite.update.blocks', {'blobs': count}, time_case(run, setup, repeat)))
+    return results
+
+def bench_player_update(repeat, counts):
+    """Player.update with N enemies on the map"""
+    settings, screen, tile_map = build_fixture()
+    player = tile_map.player
+    results = []
+    for count in counts:
+        tile_map.clear_enemies()
+        tile_map.enemies.add(create_blobs(settings, screen, tile_map, count))
+        def setup():
+            player.reset()
+            player.dying = False
+            tile_map.enemy_broadphase.rebuild(tile_map.enemies)
+        samples = time_case(lambda: player.update(tile_map, tile_map.enemies), setup, repeat)
+        results.append(summarize('Player.update', {'enemies': count}, samples))
+    tile_map.clear_enemies()
+    return results
+
+def bench_observation(repeat, counts):
+    """ObservationBuilder.build with N enemies on the map (needs numpy)"""
+    if not ObservationBuilder.available():
+        return []
+    settings, screen, tile_map = build_fixture()
+    builder = ObservationBuilder(settings, tile_map)
+    results = []
+    for count in counts:
+        tile_map.clear_enemies()
+        tile_map.enemies.add(create_blobs(settings, screen, tile_map, min(count, settings.enemy_max_population)))
+        builder.build()
+        results.append(summarize('ObservationBuilder.build', {'enemies': count}, time_case(builder.build, None, repeat, 10)))
+    tile_map.clear_enemies()
+    return results
+
+def bench_particles(repeat, counts):
+    """ParticleGenerator (and ParticleEngine, when numpy is available) update and draw with N particles"""
+    settings, screen, tile_map = build_fixture()
+    implementations = [('list', ParticleGenerator)]
+    if ParticleEngine.available():
+        implementations.append(('numpy', ParticleEngine))
+
+    results = []
+    for implementation, generator_class in implementations:
+        for count in counts:
+            generator = generator_class(screen, settings, settings.particle_gen_color, screen.get_width() / 2, screen.get_height() / 2)
+            def setup():
+                settings.rng.seed(fixture_seed)
+                # Start from nothing, generate_particles appends
+                generator.stop()
+                generator.update()
+                while generator.get_particle_count():
+                    generator.update()
+                generator.generate_particles(count)
+            params = {'implementation': implementation, 'particles': count}
+            results.append(summarize('ParticleGenerator.update', params, time_case(generator.update, setup, repeat)))
+            results.append(summarize('ParticleGenerator.draw', params, time_case(generator.draw, setup, repeat)))
+    return results
+
+def bench_level_timer(repeat):
+    """LevelTimer.update (the displayed time changes every call) and draw"""
+    settings, screen, tile_map = build_fixture()
+    level_timer = tile_map.level_timer
+    level_timer.reset()
+    return [
+        summarize('LevelTimer.update', {}, time_case(level_timer.update, None, repeat, 10)),
+        summarize('LevelTimer.draw', {}, time_case(level_timer.draw, None, repeat, 10)),
+    ]
+
+def bench_help_text(repeat):
+    """blit_help_text with the rendered text cached, and rendered from scratch"""
+    settings, screen, tile_map = build_fixture()
+    results = []
+    for cached in (True, False):
+        setup = None if cached else settings.text_cache.clear
+        gf.blit_help_text(settings, screen)
+        samples = time_case(lambda: gf.blit_help_text(settings, screen), setup, repeat, 10 if cached else 1)
+        results.append(summarize('blit_help_text', {'cached': cached}, samples))
+    return results
+
+def run_suite(repeat, counts):
+    """Run every case once, returns their results"""
+    results = []
+    results.extend(bench_draw_tiles(repeat))
+    results.extend(bench_generate_platforms(repeat))
+    results.extend(bench_level_change(repeat))
+    results.extend(bench_level_pack(repeat))
+    results.extend(bench_blob_block_collision(repeat, counts))
+    results.extend(bench_player_update(repeat, counts))
+    results.extend(bench_observation(repeat, counts))
+    results.extend(bench_particles(repeat, [count * 10 for count in counts]))
+    results.extend(bench_level_timer(repeat))
+    results.extend(bench_help_text(repeat))
+    return results
+
+def run_benchmarks(repeat, counts, rounds=1):
+    """Run the suite rounds times, repeat samples per case split over the rounds, and return the
+    results document"""
+    pygame.init()
+    samples = {}
+    cases = []
+    for suite_round in range(0, rounds):
+        for result in run_suite(max(1, repeat // rounds), counts):
+            key = get_case_key(result)
+            if key not in samples:
+                samples[key] = []
+                cases.append(result)
+            samples[key].extend(result['samples_us'])
+    results = [summarize(case['name'], case['params'], samples[get_case_key(case)]) for case in cases]
+    return {
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'platform': platform.platform(),
+        'seed': fixture_seed,
+        'results': results,
+    }
+
+def get_case_key(result):
+    """Identifies a case across runs"""
+    return result['name'] + ' ' + json.dumps(result['params'], sort_keys=True)
+
+def compare(baseline, current, threshold, min_delta):
+    """Print the median change of each case against the baseline, returns True if none regressed
+    past the threshold by more than min_delta microseconds, clear of the baseline's spread"""
+    baseline_results = {get_case_key(result): result for result in baseline['results']}
+    passed = True
+    print('{:<60} {:>12} {:>12} {:>8}'.format('case', 'base us', 'now us', 'ratio'))
+    for result in current['results']:
+        key = get_case_key(result)
+        if key not in baseline_results:
+            print('{:<60} {:>12} {:>12.2f} {:>8}'.format(key, '-', result['median_us'], 'new'))
+            continue
+        base = baseline_results[key]
+        ratio = result['median_us'] / base['median_us'] if base['median_us'] > 0 else 1.0
+        flag = ''
+        if (ratio > threshold and result['median_us'] - base['median_us'] > min_delta and
+                result['p25_us'] > base['p75_us']):
+            flag = ' SLOWER'
+            passed = False
+        print('{:<60} {:>12.2f} {:>12.2f} {:>7.2f}x{}'.format(key, base['median_us'], result['median_us'], ratio, flag))
+    return passed
+
+def main():
+    """Parse the command line, run the benchmarks, write and optionally compare the results"""
+    parser = argparse.ArgumentParser(description='Time the Py-Climber hot paths')
+    parser.add_argument('--output', help='write the results as JSON to this file (default stdout)')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=1.5, help='slowdown ratio that counts as a regression')
+    parser.add_argument('--min-delta', type=float, default=2.0, help='smallest slowdown in microseconds that counts as a regression')
+    parser.add_argument('--repeat', type=int, default=50, help='samples per case')
+    parser.add_argument('--rounds', type=int, default=5, help='passes of the suite the samples are spread over')
+    parser.add_argument('--counts', type=int, nargs='+', default=[10, 100, 500], help='enemy counts to sweep, particles use 10x')
+    args = parser.parse_args()
+
+    current = run_benchmarks(args.repeat, args.counts, args.rounds)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(current, output_file, indent=2)
+    elif not args.compare:
+        json.dump(current, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        if not compare(baseline, current, args.threshold, args.min_delta):
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark the blit cost of the raw loaded images against display format converted images.
+
+Run from the repository root (the image paths are relative):
+
+    python -m benchmarks.bench_image_format
+"""
+
+import os
+import timeit
+
+# No window is needed to measure blits
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+from src.image_resources import ImageResources
+from src.settings import Settings
+
+def time_blits(screen, images, repeat):
+    """Blit every image in the list to the screen, repeat times, and return the best time per blit in microseconds"""
+    def blit_all():
+        for image in images:
+            screen.blit(image, (100, 100))
+
+    best = min(timeit.repeat(blit_all, number=repeat, repeat=5))
+    return best / (repeat * len(images)) * 1000000
+
+def run_benchmark(repeat=200):
+    """Load the images twice, convert one set, and compare the blit cost per image group"""
+    pygame.init()
+    settings = Settings()
+    screen = pygame.display.set_mode((settings.screen_width, settings.screen_height))
+
+    raw = ImageResources(settings)
+    converted = ImageResources(settings)
+    converted.convert_to_display_format()
+
+    groups = [
+        ('tiles', 'tile_images'),
+        ('player', 'player_sprite_images'),
+        ('blob', 'enemy_blob_images'),
+        ('exit', 'blob_exit_images'),
+        ('digits', 'digit_images'),
+        ('lcd digits', 'lcd_digit_images'),
+    ]
+
+    print('{:<12} {:>12} {:>12} {:>8}'.format('images', 'raw us', 'display us', 'speedup'))
+    for name, attribute in groups:
+        raw_time = time_blits(screen, getattr(raw, attribute), repeat)
+        converted_time = time_blits(screen, getattr(converted, attribute), repeat)
+        print('{:<12} {:>12.3f} {:>12.3f} {:>7.2f}x'.format(name, raw_time, converted_time, raw_time / converted_time))
+
+    # convert_to_display_format keeps the lcd frame (no colorkey) as loaded, convert it here to
+    # show why
+    singles = [
+        ('block', raw.block_image, converted.block_image),
+        ('lcd frame', raw.lcd_frame_image, raw.lcd_frame_image.convert()),
+        ('level text', raw.level_image, converted.level_image),
+    ]
+    for name, raw_image, converted_image in singles:
+        raw_time = time_blits(screen, [raw_image], repeat)
+        converted_time = time_blits(screen, [converted_image], repeat)
+        print('{:<12} {:>12.3f} {:>12.3f} {:>7.2f}x'.format(name, raw_time, converted_time, raw_time / converted_time))
+
+if __name__ == '__main__':
+    run_benchmark()
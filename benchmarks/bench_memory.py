@@ -0,0 +1,70 @@
+"""Measure the memory held per particle, block and blob, i.e. the per-object overhead that
+dominates once there are thousands of particles and hundreds of blocks alive.
+
+The objects are made through their owners (ParticleGenerator, Tilemap, BlobPool) so the same
+script can be run against an older checkout to compare.  Run from the repository root (the
+image paths are relative):
+
+    python -m benchmarks.bench_memory
+"""
+
+import os
+import random
+import tracemalloc
+
+# No window is needed
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+from src.blob_enemy import Blob
+from src.image_resources import ImageResources
+from src.particle_generator import ParticleGenerator
+from src.settings import Settings
+from src.tilemap import Tilemap
+
+# Objects made per measurement
+sample_count = 5000
+
+def measure(create_objects):
+    """Bytes allocated per object by create_objects(sample_count), the objects are kept alive until measured"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = create_objects(sample_count)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # The container holding the objects isn't part of their cost
+    container_bytes = objects.__sizeof__()
+    return (after - before - container_bytes) / len(objects)
+
+def main():
+    """Print bytes per object for each type"""
+    pygame.init()
+    settings = Settings()
+    screen = pygame.display.set_mode((settings.screen_width, settings.screen_height))
+    image_res = ImageResources(settings)
+    settings.image_res = image_res
+    image_res.convert_to_display_format()
+    random.seed(1)
+    tile_map = Tilemap(settings, screen, settings.map_indicies, image_res.tile_images, image_res.block_image,
+        image_res.blob_exit_images, image_res.player_sprite_images, image_res.enemy_blob_images)
+
+    def create_particles(count):
+        particle_gen = ParticleGenerator(screen, settings, settings.particle_gen_color, 0, 0)
+        particle_gen.generate_particles(count)
+        return particle_gen.particles
+
+    def create_blocks(count):
+        return [tile_map.generate_block(0, 0) for index in range(0, count)]
+
+    def create_blobs(count):
+        return [Blob(settings, screen, image_res.enemy_blob_images) for index in range(0, count)]
+
+    # Warm up, the first blob builds the shared animation table
+    create_blobs(1)
+
+    print('{:<10}{:>14}'.format('object', 'bytes/object'))
+    for name, create_objects in (('particle', create_particles), ('block', create_blocks), ('blob', create_blobs)):
+        print('{:<10}{:>14.1f}'.format(name, measure(create_objects)))
+
+if __name__ == '__main__':
+    main()
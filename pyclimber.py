@@ -1,22 +1,44 @@
 """This module is the main entry for the Py-Climber game"""
 
 import src.game_functions as gf
+from src.dirty_rect_renderer import DirtyRectRenderer
+from src.game_loop import GameLoop
 from src.image_resources import ImageResources
+from src.replay_player import ReplayPlayer
+from src.replay_recorder import ReplayRecorder
 from src.settings import Settings
 from src.tilemap import Tilemap
-import random
+import argparse
 import pygame
 
-def run_game():
-    """Main entry point for Py-Climber"""
+def start_session(settings, seed=None, record_path=None, replay_path=None):
+    """Seed the random streams, and set up recording or replaying the session's input.  This
+    has to happen before create_game, the map is generated from the seed"""
+    # A replay brings its own seed
+    if replay_path:
+        settings.replayer = ReplayPlayer(replay_path)
+        seed = settings.replayer.seed
+    settings.rng.seed(seed)
 
-    # Startup pygame object
-    pygame.init()
+    if record_path:
+        settings.recorder = ReplayRecorder(record_path, settings.rng.seed_value, settings.replay_checksum_interval)
 
-    random.seed()
+def end_session(settings):
+    """Finish writing the recording, if there is one"""
+    if settings.recorder:
+        settings.recorder.close()
 
-    # Load our settings object and image resources, disk I/O that can be done in advance
-    settings = Settings()
+def report_replay(settings):
+    """Print how far the replay got and whether the game stayed in step with the recording"""
+    replayer = settings.replayer
+    print('Replay {} after {} checksums, {}'.format(
+        'finished' if replayer.is_finished(settings.animation_clock.tick) else 'stopped', replayer.checksums_checked,
+        'never diverged' if replayer.diverged_tick is None else 'diverged at tick {}'.format(replayer.diverged_tick)))
+
+def create_screen(settings):
+    """Load the images and create the screen, returns the screen.  This is shared by every game
+    running in the process (see climber_batch_env.py)"""
+    # Load our image resources, disk I/O that can be done in advance
     image_res = ImageResources(settings)
     # Add to the cache so it's accessible where needed
     settings.image_res = image_res
@@ -24,7 +46,15 @@ def run_game():
     # Create the main screen to render to based on settings
     screen = pygame.display.set_mode((settings.screen_width, settings.screen_height))
     pygame.display.set_caption(settings.caption)
-    
+
+    # Now that the display exists, match the images to its pixel format for faster blits
+    image_res.convert_to_display_format()
+    return screen
+
+def create_tile_map(settings, screen):
+    """Create the tilemap (which owns all of the game objects) and reset it for a new game"""
+    image_res = settings.image_res
+
     # Create a 2D tilemap - this takes a list of indices and an image list to produce a tiled surface
     tile_map = Tilemap(settings, screen, settings.map_indicies, image_res.tile_images, 
         image_res.block_image, image_res.blob_exit_images, image_res.player_sprite_images, image_res.enemy_blob_images)
@@ -34,21 +64,52 @@ def run_game():
 
     # Reset the game
     gf.reset_game(tile_map)
+    return tile_map
+
+def create_game(settings):
+    """Create the screen and the tilemap (which owns all of the game objects), returns (screen, tile_map)"""
+    screen = create_screen(settings)
+    tile_map = create_tile_map(settings, screen)
+
+    # Optionally only redraw the parts of the screen that change each frame
+    if settings.dirty_rect_rendering:
+        settings.renderer = DirtyRectRenderer(settings, screen, tile_map)
+
+    return screen, tile_map
+
+def run_game(seed=None, record_path=None, replay_path=None):
+    """Main entry point for Py-Climber"""
+
+    # Startup pygame object
+    pygame.init()
+
+    # Load our settings object, seed the session, then create the screen and the game objects
+    settings = Settings()
+    start_session(settings, seed, record_path, replay_path)
+    screen, tile_map = create_game(settings)
+
+    # Renders at a fixed 30 FPS and runs the simulation in fixed ticks in between, at 1x
+    # speed that is one tick per frame (see simulation_speed in settings.py to speed it up)
+    game_loop = GameLoop(settings, screen, tile_map)
+    try:
+        # A replay stops once its recorded input runs out
+        while not (settings.replayer and settings.replayer.is_finished(settings.animation_clock.tick)):
+            game_loop.run_frame()
+    finally:
+        # ESC and closing the window exit from inside the loop
+        end_session(settings)
+        if settings.replayer:
+            report_replay(settings)
+
+def main():
+    """Parse the command line and run the game"""
+    parser = argparse.ArgumentParser(description='Py-Climber')
+    parser.add_argument('--seed', type=int, help='seed for the session (random if not given)')
+    parser.add_argument('--record', help='record the session\'s input to this file')
+    parser.add_argument('--replay', help='replay a recorded session, the keyboard is ignored other than ESC, F3 and F9, and the game ends with the recording')
+    args = parser.parse_args()
+    run_game(args.seed, args.record, args.replay)
 
-    # Use pygame's simple loop management for a fixed 30 FPS
-    clock = pygame.time.Clock()
-    while True:
-        # Should make sure each frame spends at least 1/30 seconds in this loop
-        # downside is wasted sleep on fast hardware and slow hardware will lag
-        # but slow hardware will always lag and implementing a time-delta based
-        # loop for this simple game is IMHO overkill.
-        clock.tick(30)
-
-        # Process system events (key-presses, joystick, etc)
-        gf.check_events(settings, screen, tile_map)
-
-        # Update the game (this will update all sub-object and render them to the screen)
-        gf.update_screen(settings, screen, tile_map)
-    
-# Invokes the function above when the script is run
-run_game()
+# Invokes the function above when the script is run (pyclimber_headless.py imports create_game)
+if __name__ == '__main__':
+    main()
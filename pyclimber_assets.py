@@ -0,0 +1,39 @@
+"""This module bakes the Py-Climber images into an asset pack (see src/asset_pack.py), so the game
+starts without decoding and slicing the bitmaps.  Run it from the repository root (the image
+paths are relative) whenever the images change, until then the game notices the pack is stale and
+loads the bitmaps:
+
+    python pyclimber_assets.py
+"""
+
+import argparse
+import os
+import time
+
+# No window is needed to load the images
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+from src.image_resources import ImageResources
+from src.settings import Settings
+
+def main():
+    """Parse the command line, load the bitmaps and write the pack"""
+    pygame.init()
+    settings = Settings()
+    parser = argparse.ArgumentParser(description='Bake the Py-Climber images into an asset pack')
+    parser.add_argument('--output', default=settings.asset_pack_path, help='asset pack file to write')
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    # Always from the bitmaps, never from an existing pack
+    settings.asset_pack_path = None
+    image_res = ImageResources(settings)
+    image_res.write_asset_pack(args.output)
+    wall_time = time.perf_counter() - start_time
+
+    print('pack size:       {} bytes'.format(os.path.getsize(args.output)))
+    print('wall time:       {:.3f}s'.format(wall_time))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""This module runs many headless Py-Climber episodes across a pool of processes and aggregates the
+results, e.g. to evaluate an agent.  Each worker process holds one ClimberEnv and plays episodes
+on it, one per seed.  For example, 256 episodes of the random agent on every core:
+
+    python pyclimber_farm.py --episodes 256 --policy random --output results.json
+
+The policy is 'random', 'noop' or 'module:function' naming a function policy(observation, rng)
+that returns one of the ClimberEnv actions.  rng is a random.Random seeded for the episode, so
+a run is reproducible whatever the number of processes.
+
+With --level-pack the episodes play the levels of a pack (see pyclimber_levels.py) instead of
+generating them, --seed and --episodes then pick the levels by index.
+"""
+
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import time
+
+# Use SDL's dummy video driver unless told otherwise, nothing is ever shown
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+from src.climber_env import ClimberEnv
+from src.level_pack import LevelPack
+
+def random_policy(observation, rng):
+    """Any action, uniformly"""
+    return rng.randrange(ClimberEnv.action_count)
+
+def noop_policy(observation, rng):
+    """Stand still"""
+    return ClimberEnv.action_noop
+
+builtin_policies = {'random': random_policy, 'noop': noop_policy}
+
+def load_policy(name):
+    """A built-in policy by name, or 'module:function'"""
+    if name in builtin_policies:
+        return builtin_policies[name]
+    if ':' not in name:
+        raise ValueError('unknown policy "{}", expected one of {} or "module:function"'.format(name, ', '.join(builtin_policies)))
+    module_name, function_name = name.split(':', 1)
+    return getattr(importlib.import_module(module_name), function_name)
+
+# The worker process's environment, policy and level pack, set up once by init_worker
+worker_env = None
+worker_policy = None
+worker_level_pack = None
+
+def init_worker(policy_name, max_ticks, level_limit, level_pack_path=None):
+    """Create the worker's environment, every episode it runs reuses it"""
+    global worker_env, worker_policy, worker_level_pack
+    worker_env = ClimberEnv()
+    worker_env.settings.env_max_ticks = max_ticks
+    worker_env.settings.env_level_limit = level_limit
+    worker_policy = load_policy(policy_name)
+    if level_pack_path:
+        # Every worker maps the same file, so the pages are shared
+        worker_level_pack = LevelPack(level_pack_path)
+
+def run_episode(seed):
+    """Play one episode on the worker's environment, returns its summary.  With a level pack, the
+    seed is the index of the level to play"""
+    env = worker_env
+    rng = random.Random(seed)
+    start_time = time.perf_counter()
+    level_index = None
+    if worker_level_pack is not None:
+        level_index = seed
+        level = worker_level_pack.get_level(level_index)
+        seed = level.seed
+        observation = env.reset(seed, level)
+    else:
+        observation = env.reset(seed)
+    total_reward = 0.0
+    done = False
+    while not done:
+        observation, reward, done, info = env.step(worker_policy(observation, rng))
+        total_reward += reward
+
+    levels_cleared, player_deaths, blobs_killed = env.get_totals()
+    return {
+        'seed': seed,
+        'level': level_index,
+        'ticks': info['ticks'],
+        'reward': total_reward,
+        'levels_cleared': levels_cleared,
+        'player_deaths': player_deaths,
+        'blobs_killed': blobs_killed,
+        'truncated': info['truncated'],
+        'wall_time_s': time.perf_counter() - start_time,
+    }
+
+def run_farm(seeds, policy_name, processes=None, max_ticks=30 * 60 * 3, level_limit=1, level_pack_path=None):
+    """Run an episode for each seed (or level of the pack) across the pool and return the aggregate
+    results, processes defaults to one per core"""
+    start_time = time.perf_counter()
+    pool = multiprocessing.Pool(processes, init_worker, (policy_name, max_ticks, level_limit, level_pack_path))
+    try:
+        episodes = pool.map(run_episode, seeds)
+    finally:
+        # Let the workers finish and exit on their own
+        pool.close()
+        pool.join()
+    wall_time = time.perf_counter() - start_time
+
+    rewards = [episode['reward'] for episode in episodes]
+    total_ticks = sum(episode['ticks'] for episode in episodes)
+    return {
+        'policy': policy_name,
+        'processes': processes or os.cpu_count(),
+        'episodes': len(episodes),
+        'total_ticks': total_ticks,
+        'wall_time_s': wall_time,
+        'ticks_per_s': total_ticks / wall_time if wall_time > 0 else 0.0,
+        'reward_mean': statistics.mean(rewards) if rewards else 0.0,
+        'reward_min': min(rewards, default=0.0),
+        'reward_max': max(rewards, default=0.0),
+        'levels_cleared': sum(episode['levels_cleared'] for episode in episodes),
+        'player_deaths': sum(episode['player_deaths'] for episode in episodes),
+        'blobs_killed': sum(episode['blobs_killed'] for episode in episodes),
+        'results': episodes,
+    }
+
+def main():
+    """Parse the command line, run the episodes and print the aggregate results"""
+    parser = argparse.ArgumentParser(description='Run headless Py-Climber episodes across a pool of processes')
+    parser.add_argument('--episodes', type=int, default=64, help='number of episodes to run')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first episode, the rest count up from it')
+    parser.add_argument('--processes', type=int, help='worker processes (default one per core)')
+    parser.add_argument('--policy', default='random', help='random, noop or module:function')
+    parser.add_argument('--max-ticks', type=int, default=30 * 60 * 3, help='ticks before an episode is cut short (0 for no limit)')
+    parser.add_argument('--levels', type=int, default=1, help='levels to clear to finish an episode (0 for no limit)')
+    parser.add_argument('--level-pack', help='play the levels of this pack (see pyclimber_levels.py), --seed is the first level')
+    parser.add_argument('--output', help='write the aggregate and per-episode results as JSON to this file')
+    args = parser.parse_args()
+    if args.max_ticks <= 0 and args.levels <= 0:
+        parser.error('with neither --max-ticks nor --levels positive the episodes would never end')
+
+    seeds = range(args.seed, args.seed + args.episodes)
+    summary = run_farm(seeds, args.policy, args.processes, args.max_ticks, args.levels, args.level_pack)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(summary, output_file, indent=2)
+
+    print('policy:          {}'.format(summary['policy']))
+    print('processes:       {}'.format(summary['processes']))
+    print('episodes:        {}'.format(summary['episodes']))
+    print('ticks:           {}'.format(summary['total_ticks']))
+    print('wall time:       {:.3f}s'.format(summary['wall_time_s']))
+    print('ticks/s:         {:.1f}'.format(summary['ticks_per_s']))
+    print('reward:          {:.3f} mean, {:.3f} min, {:.3f} max'.format(summary['reward_mean'], summary['reward_min'], summary['reward_max']))
+    print('levels cleared:  {}'.format(summary['levels_cleared']))
+    print('player deaths:   {}'.format(summary['player_deaths']))
+    print('blobs killed:    {}'.format(summary['blobs_killed']))
+
+if __name__ == '__main__':
+    main()
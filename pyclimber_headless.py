@@ -0,0 +1,133 @@
+"""This module is the headless entry for Py-Climber, it runs the game without a window (CI, simulation hosts)
+as fast as possible and prints a summary.  For example, 3000 frames with a scripted run to the right:
+
+    python pyclimber_headless.py --seed 7 --frames 3000 --levels 2 --input run_right.txt
+
+The input script has one key event per line, '<frame> <key> <down|up>' with pygame key names
+(e.g. 'left', 'right', 'space', 'a', 'r'), and '#' starts a comment:
+
+    # walk right, and jump a little later
+    0 right down
+    45 space down
+    45 space up
+
+Sessions can be recorded (--record) and replayed (--replay) exactly, e.g. to compare the
+performance of two versions on an identical workload.  A replay runs to the end of the
+recording unless --frames is given, and the summary reports the first frame the game state
+diverged from the recording on, if any.
+"""
+
+import argparse
+import os
+import time
+
+# Use SDL's dummy video driver unless told otherwise, nothing is ever shown
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+import src.game_functions as gf
+from pyclimber import create_game, start_session, end_session
+from src.game_loop import GameLoop
+from src.settings import Settings
+
+def load_input_script(path):
+    """Parse an input script into a dict of frame -> list of (event type, key)"""
+    event_types = {'down': pygame.KEYDOWN, 'up': pygame.KEYUP}
+    scripted_input = {}
+    with open(path) as script:
+        for line_number, line in enumerate(script, 1):
+            line = line.split('#')[0].strip()
+            if not line:
+                continue
+
+            fields = line.split()
+            if len(fields) != 3 or not fields[0].isdigit() or fields[2] not in event_types:
+                raise ValueError('{}:{}: expected "<frame> <key> <down|up>"'.format(path, line_number))
+            key = pygame.key.key_code(fields[1])
+            scripted_input.setdefault(int(fields[0]), []).append((event_types[fields[2]], key))
+    return scripted_input
+
+def post_scripted_input(events):
+    """Queue the scripted key events so check_events handles them like real key presses"""
+    for event_type, key in events:
+        pygame.event.post(pygame.event.Event(event_type, key=key, mod=0, unicode='', scancode=0))
+
+def run_headless(seed, frames, level_limit=0, input_script=None, render=True, settings=None, record_path=None, replay_path=None):
+    """Run the update/draw pipeline for the number of frames (or until level_limit levels are
+    cleared, 0 for no limit) and return a summary dict.  With a replay, frames=None runs it to the end"""
+    pygame.init()
+
+    # The map layout and the enemies are all generated from the seed (or the replay's seed)
+    if settings is None:
+        settings = Settings()
+    start_session(settings, seed, record_path, replay_path)
+    replayer = settings.replayer
+    if frames is None and not replayer:
+        frames = 1000
+    settings.simulation_speed = 0
+    settings.render_enabled = render
+    screen, tile_map = create_game(settings)
+
+    scripted_input = {}
+    if input_script:
+        scripted_input = load_input_script(input_script)
+
+    # One tick per frame, with the input applied before the tick it's scripted for
+    game_loop = GameLoop(settings, screen, tile_map)
+    start_time = time.perf_counter()
+    try:
+        while frames is None or game_loop.ticks < frames:
+            # Without a frame count, a replay runs until its recorded input runs out
+            if frames is None and replayer.is_finished(settings.animation_clock.tick):
+                break
+            if level_limit and tile_map.levels_cleared >= level_limit:
+                break
+            post_scripted_input(scripted_input.get(game_loop.ticks, []))
+            gf.check_events(settings, screen, tile_map)
+            game_loop.step()
+            game_loop.render()
+    finally:
+        end_session(settings)
+    wall_time = time.perf_counter() - start_time
+
+    summary = {
+        'seed': settings.rng.seed_value,
+        'frames': game_loop.ticks,
+        'frames_rendered': game_loop.frames,
+        'levels_cleared': tile_map.levels_cleared,
+        'wall_time_s': wall_time,
+        'fps': game_loop.ticks / wall_time if wall_time > 0 else 0.0,
+    }
+    if replayer:
+        summary['replay_finished'] = replayer.is_finished(settings.animation_clock.tick)
+        summary['checksums_checked'] = replayer.checksums_checked
+        summary['diverged_frame'] = replayer.diverged_tick
+    return summary
+
+def main():
+    """Parse the command line, run the game and print the summary"""
+    parser = argparse.ArgumentParser(description='Run Py-Climber without a window and print a summary')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the map and enemy generation')
+    parser.add_argument('--frames', type=int, help='number of frames to simulate (default 1000, or the whole replay)')
+    parser.add_argument('--levels', type=int, default=0, help='stop after this many levels are cleared (0 for no limit)')
+    parser.add_argument('--input', help='scripted input file, see the module docstring for the format')
+    parser.add_argument('--no-render', action='store_true', help='skip drawing entirely, only run the updates')
+    parser.add_argument('--record', help='record the session\'s input and state checksums to this file')
+    parser.add_argument('--replay', help='replay a recorded session (its seed replaces --seed)')
+    args = parser.parse_args()
+
+    summary = run_headless(args.seed, args.frames, args.levels, args.input, not args.no_render,
+        record_path=args.record, replay_path=args.replay)
+    print('seed:            {}'.format(summary['seed']))
+    print('frames:          {}'.format(summary['frames']))
+    print('frames rendered: {}'.format(summary['frames_rendered']))
+    print('levels cleared:  {}'.format(summary['levels_cleared']))
+    print('wall time:       {:.3f}s'.format(summary['wall_time_s']))
+    print('fps:             {:.1f}'.format(summary['fps']))
+    if 'diverged_frame' in summary:
+        print('replay finished: {}'.format('yes' if summary['replay_finished'] else 'no'))
+        print('checksums:       {}'.format(summary['checksums_checked']))
+        print('diverged at:     {}'.format('never' if summary['diverged_frame'] is None else summary['diverged_frame']))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""This module bakes Py-Climber levels into a level pack (see src/level_pack.py), e.g. a fixed set
+of levels to benchmark or run a tournament on.  Level i of the pack is the first level of an
+episode seeded with first seed + i, the same map ClimberEnv.reset(seed) plays:
+
+    python pyclimber_levels.py --levels 1000 --seed 0 --output tournament.pack
+
+An episode started on a level from the pack (ClimberEnv.reset(level=...), or pyclimber_farm.py
+--level-pack) loads its blocks instead of generating them.
+"""
+
+import argparse
+import os
+import time
+
+# Use SDL's dummy video driver unless told otherwise, nothing is ever shown
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+from pyclimber import create_game
+from src.level_data import LevelData
+from src.level_pack import LevelPack
+from src.settings import Settings
+
+def bake_levels(seeds, settings=None):
+    """Generate the first level of a session for each seed, returns them as LevelData"""
+    pygame.init()
+    if settings is None:
+        settings = Settings()
+    settings.render_enabled = False
+    screen, tile_map = create_game(settings)
+
+    levels = []
+    for seed in seeds:
+        settings.rng.seed(seed)
+        tile_map.reset()
+        levels.append(LevelData.from_tile_map(tile_map))
+    return levels
+
+def main():
+    """Parse the command line, bake the levels and write the pack"""
+    parser = argparse.ArgumentParser(description='Bake Py-Climber levels into a level pack')
+    parser.add_argument('--levels', type=int, default=1000, help='number of levels to bake')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first level, the rest count up from it')
+    parser.add_argument('--output', required=True, help='level pack file to write')
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    levels = bake_levels(range(args.seed, args.seed + args.levels))
+    LevelPack.write(args.output, levels)
+    wall_time = time.perf_counter() - start_time
+
+    print('levels:          {}'.format(len(levels)))
+    print('pack size:       {} bytes'.format(os.path.getsize(args.output)))
+    print('wall time:       {:.3f}s'.format(wall_time))
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,15 @@ from pygame.sprite import Sprite
 class AnimatedSprite(Sprite):
     """Animated Sprite object holding shared logic"""
 
+    # There can be hundreds of blobs, so keep the state in slots rather than a dict per sprite
+    __slots__ = ('settings', 'screen', 'images', 'rect', 'dx', 'dy', 'falling', 'falling_frames', 'dying',
+        'animations', 'current_animation', 'animation_clock', 'animation_start_tick', 'facing_left',
+        'margin_left', 'margin_right', 'margin_top', 'margin_bottom', 'bound_by_the_laws_of_physics',
+        'bound_by_map', 'collision_check')
+
+    # Animations are immutable, so each sprite type builds its table once and every instance shares it
+    animation_table = None
+
     def __init__(self, settings, screen, images):
         """Init the Animated Sprite logic"""
         super().__init__()
@@ -13,7 +22,6 @@ class AnimatedSprite(Sprite):
         self.settings = settings
         self.screen = screen
         self.images = images
-        self.screen_rect = screen.get_rect()
 
         # All images are the same size, so set the rect to the first one
         self.rect = images[0].get_rect()
@@ -26,8 +34,11 @@ class AnimatedSprite(Sprite):
         self.dying = False
 
         # These are designed to be overridden by the parent class
-        self.animations = {}
+        self.animations = self.get_animation_table()
         self.current_animation = None
+        # The tick the current animation was entered, the frame shown is derived from this
+        self.animation_clock = settings.animation_clock
+        self.animation_start_tick = self.animation_clock.tick
         self.facing_left = False
         self.margin_left = 0
         self.margin_right = 0
@@ -41,11 +52,35 @@ class AnimatedSprite(Sprite):
         # Collision check callback (optional)
         self.collision_check = None
 
+    @property
+    def screen_rect(self):
+        """The screen's rect, asked for when needed rather than a copy kept by every sprite"""
+        return self.screen.get_rect()
+
+    def get_animation_table(self):
+        """Returns the animations shared by every sprite of this type, built on first use"""
+        sprite_type = type(self)
+        if 'animation_table' not in sprite_type.__dict__:
+            sprite_type.animation_table = self.create_animations()
+        return sprite_type.animation_table
+
+    def create_animations(self):
+        """Should be implemented by the derived class, returns a dict of animation id to Animation"""
+        return {}
+
     def set_current_animation(self, animation_id):
-        """Update and reset the animation sequence - does nothing if id is the same as current, use reset() for that"""
+        """Update and restart the animation sequence - does nothing if id is the same as current, use restart_animation() for that"""
         if (self.current_animation != animation_id):
             self.current_animation = animation_id
-            self.animations[self.current_animation].reset()
+            self.restart_animation()
+
+    def restart_animation(self):
+        """Start the current animation over from its first frame"""
+        self.animation_start_tick = self.animation_clock.tick
+
+    def get_current_frame(self):
+        """Returns the index of the image to draw for the current animation"""
+        return self.animations[self.current_animation].get_frame(self.animation_clock.tick - self.animation_start_tick)
 
     def handle_collision(self, collision_list, group):
         """Should be implemented by the derived class"""
@@ -108,7 +143,11 @@ class AnimatedSprite(Sprite):
         
          # Sprite collision
         if collision_check_group:
-            intersected_sprites = pygame.sprite.spritecollide(self, collision_check_group, False, self.collision_check)
+            if collision_check_group is tile_map.block_group:
+                # Blocks sit on a fixed grid, so the tilemap can just check the nearby cells
+                intersected_sprites = tile_map.block_grid.collide(self, self.collision_check)
+            else:
+                intersected_sprites = pygame.sprite.spritecollide(self, collision_check_group, False, self.collision_check)
             # This is required by the implementing class, this function will allow the sub-types of
             # sprite objects to handle the collisions differently - just like the self.collision_check
             # function allows them to alter the actual collision detection (e.g. based on transparent margins)
@@ -116,10 +155,10 @@ class AnimatedSprite(Sprite):
 
     def finish_update(self):
         """Common code to close out a frame update"""
+        # No per-frame animation state to step, the clock moves everything along
         self.update_current_animation()
-        self.animations[self.current_animation].animate()
 
     def draw(self):
         """Draws the animated sprite's current frame at its current position on the screen"""
-        frame_index = self.animations[self.current_animation].get_current_frame()
+        frame_index = self.get_current_frame()
         self.screen.blit(self.images[frame_index], self.rect)
\ No newline at end of file
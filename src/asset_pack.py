@@ -0,0 +1,101 @@
+"""This module implements the baked image asset pack for Py-Climber"""
+
+import mmap
+import struct
+import pygame
+
+# File layout: a header (magic, version, fingerprint of the source images, number of entries), a
+# table of entries (name, frame width and height, number of frames, colorkey flag and color,
+# offset of the pixels) and then the pixels of each entry's frames back to back as raw RGB rows.
+# An entry's frames are stacked top to bottom, so they read as one sheet a frame wide
+asset_pack_magic = b'PYAP'
+asset_pack_version = 1
+asset_pack_header = struct.Struct('<4sHII')
+asset_pack_entry = struct.Struct('<24sHHHB3BI')
+asset_pack_pixel_format = 'RGB'
+
+class AssetPack():
+    """Named lists of already sliced frames, stored as raw pixels so loading them is wrapping the
+    memory-mapped bytes in Surfaces (pygame.image.frombuffer) rather than decoding and slicing
+    bitmaps.  The fingerprint is whatever the writer says the frames were made from (see
+    ImageResources.get_fingerprint), a reader compares it to decide whether the pack is stale.
+    The Surfaces share the pack's memory, so the pack has to outlive them (converting them to the
+    display format makes copies)"""
+
+    @staticmethod
+    def write(path, fingerprint, entries):
+        """Bake the entries, a list of (name, frames), into a new pack file.  The frames of an entry
+        must all be the same size and have the same colorkey"""
+        table = []
+        pixels = []
+        offset = asset_pack_header.size + asset_pack_entry.size * len(entries)
+        for name, frames in entries:
+            width, height = frames[0].get_size()
+            colorkey = frames[0].get_colorkey()
+            data = b''.join(pygame.image.tobytes(frame, asset_pack_pixel_format) for frame in frames)
+            key_color = tuple(colorkey[:3]) if colorkey else (0, 0, 0)
+            table.append(asset_pack_entry.pack(name.encode('ascii'), width, height, len(frames), colorkey is not None,
+                *key_color, offset))
+            pixels.append(data)
+            offset += len(data)
+
+        with open(path, 'wb') as pack_file:
+            pack_file.write(asset_pack_header.pack(asset_pack_magic, asset_pack_version, fingerprint, len(entries)))
+            for entry in table:
+                pack_file.write(entry)
+            for data in pixels:
+                pack_file.write(data)
+
+    def __init__(self, path):
+        """Map the pack file and read its table, no pixels are touched until asked for"""
+        with open(path, 'rb') as pack_file:
+            # Mapping a file keeps it open, the handle can go
+            self.data = mmap.mmap(pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = None
+
+        if len(self.data) < asset_pack_header.size:
+            self.close()
+            raise ValueError('{} is not a Py-Climber asset pack'.format(path))
+        magic, version, self.fingerprint, count = asset_pack_header.unpack_from(self.data, 0)
+        if magic != asset_pack_magic or version != asset_pack_version:
+            # An older pack is just stale, nothing in it will match
+            self.fingerprint = None
+            count = 0
+
+        # name -> (width, height, frames, colorkey or None, offset)
+        self.entries = {}
+        for index in range(0, count):
+            name, width, height, frames, has_colorkey, red, green, blue, offset = asset_pack_entry.unpack_from(
+                self.data, asset_pack_header.size + index * asset_pack_entry.size)
+            if offset + width * height * 3 * frames > len(self.data):
+                self.close()
+                raise ValueError('{} is truncated'.format(path))
+            colorkey = (red, green, blue) if has_colorkey else None
+            self.entries[name.rstrip(b'\0').decode('ascii')] = (width, height, frames, colorkey, offset)
+        self.view = memoryview(self.data)
+
+    def create_surface(self, offset, size, colorkey):
+        """A Surface over the pixels at the offset"""
+        width, height = size
+        surface = pygame.image.frombuffer(self.view[offset:offset + width * height * 3], size, asset_pack_pixel_format)
+        if colorkey:
+            surface.set_colorkey(colorkey)
+        return surface
+
+    def get_images(self, name):
+        """The entry's frames, one Surface each"""
+        width, height, frames, colorkey, offset = self.entries[name]
+        frame_bytes = width * height * 3
+        return [self.create_surface(offset + index * frame_bytes, (width, height), colorkey) for index in range(0, frames)]
+
+    def get_sheet(self, name):
+        """The entry's frames as one Surface, stacked top to bottom"""
+        width, height, frames, colorkey, offset = self.entries[name]
+        return self.create_surface(offset, (width, height * frames), colorkey)
+
+    def close(self):
+        """Unmap the file, only once nothing is using its pixels"""
+        if self.view is not None:
+            self.view.release()
+        if not self.data.closed:
+            self.data.close()
@@ -8,6 +8,8 @@ from src.animated_sprite import AnimatedSprite
 class Blob(AnimatedSprite):
     """Blob enemy object"""
 
+    __slots__ = ('pool', 'pooled')
+
     def __init__(self, settings, screen, images):
         """Initialize the blob"""
         super().__init__(settings, screen, images)
@@ -15,15 +17,41 @@ class Blob(AnimatedSprite):
         # Override the start position
         self.dx = self.settings.enemy_blob_dx
         
-        # Set the blob-specific animations
-        self.animations[self.settings.anim_name_walk_left] = Animation([0, 1, 2, 1], 2)
-        self.animations[self.settings.anim_name_walk_right] = Animation([3, 4, 5, 4], 2)
-        self.animations[self.settings.anim_name_jump_down_left] = Animation([6], 1)
-        self.animations[self.settings.anim_name_jump_down_right] = Animation([6], 1)
-        self.animations[self.settings.anim_name_dead] = Animation([7], 60)
+        # Start out walking right
+        self.current_animation = self.settings.anim_name_walk_right
+        self.facing_left = False
+
+        # Set by BlobPool, killed blobs go back to the pool
+        self.pool = None
+        self.pooled = False
+
+    def reset(self):
+        """Put the blob back in the state __init__ leaves it in, so the pool can reuse it"""
+        self.dx = self.settings.enemy_blob_dx
+        self.dy = 0.0
+        self.falling = False
+        self.falling_frames = 0
+        self.dying = False
         self.current_animation = self.settings.anim_name_walk_right
+        self.restart_animation()
         self.facing_left = False
 
+    def create_animations(self):
+        """The blob-specific animations, shared by every blob"""
+        return {
+            self.settings.anim_name_walk_left: Animation([0, 1, 2, 1], 2),
+            self.settings.anim_name_walk_right: Animation([3, 4, 5, 4], 2),
+            self.settings.anim_name_jump_down_left: Animation([6], 1),
+            self.settings.anim_name_jump_down_right: Animation([6], 1),
+            self.settings.anim_name_dead: Animation([7], 60),
+        }
+
+    def kill(self):
+        """Remove the blob from all groups, and hand it back to its pool"""
+        super().kill()
+        if self.pool:
+            self.pool.release(self)
+
     def update_current_animation(self):
         """Set the correct animation based on state"""
         # DYING
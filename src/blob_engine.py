@@ -0,0 +1,409 @@
+"""Vectorized blob enemy simulation for Py-Climber, an optional replacement for per-Blob updates"""
+from src.blob_enemy import Blob
+from src.enemy_broadphase import EnemyBroadphase
+import pygame
+
+# numpy is optional, without it the game keeps using Blob objects in a Group
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def rect_round(values):
+    """Round the way pygame.Rect does when a float is assigned to it (halves away from zero)"""
+    return numpy.where(values >= 0, numpy.floor(values + 0.5), numpy.ceil(values - 0.5)).astype(numpy.int64)
+
+class BlobView():
+    """A thin stand-in for a Blob sprite whose state lives in the engine's arrays.  Player and BlobExit
+    only read the rect and a few flags, or flag a blob as dying, which this writes straight through"""
+
+    def __init__(self, engine, slot):
+        """A view of one slot in the engine"""
+        self.engine = engine
+        self.slot = slot
+
+    def __eq__(self, other):
+        return isinstance(other, BlobView) and self.engine is other.engine and self.slot == other.slot
+
+    def __hash__(self):
+        return hash((id(self.engine), self.slot))
+
+    @property
+    def rect(self):
+        """A copy of the blob's current rect"""
+        engine = self.engine
+        return pygame.Rect(int(engine.left[self.slot]), int(engine.top[self.slot]), engine.width, engine.height)
+
+    @property
+    def dying(self):
+        return bool(self.engine.dying[self.slot])
+
+    @dying.setter
+    def dying(self, value):
+        self.engine.dying[self.slot] = value
+
+    @property
+    def dx(self):
+        return float(self.engine.dx[self.slot])
+
+    @dx.setter
+    def dx(self, value):
+        self.engine.dx[self.slot] = value
+
+    @property
+    def dy(self):
+        return float(self.engine.dy[self.slot])
+
+    @dy.setter
+    def dy(self, value):
+        self.engine.dy[self.slot] = value
+
+    @property
+    def falling(self):
+        return bool(self.engine.falling[self.slot])
+
+    @property
+    def facing_left(self):
+        return bool(self.engine.facing_left[self.slot])
+
+    @property
+    def current_animation(self):
+        return self.engine.animation_names[self.engine.animation[self.slot]]
+
+    def alive(self):
+        """Same as Sprite.alive(), False once the blob has been removed"""
+        return bool(self.engine.active[self.slot])
+
+    def kill(self):
+        """Same as Sprite.kill()"""
+        self.engine.remove_slot(self.slot)
+
+    def draw(self):
+        """Draw just this blob"""
+        self.engine.draw_slots([self.slot])
+
+class BlobEngine(EnemyBroadphase):
+    """Holds every blob's state (position, velocity, falling, dying, facing, animation) in numpy arrays
+    and advances the whole population in one vectorized step, with the same results as calling
+    Blob.update() on each of them.  It stands in for both the enemies Group (add/empty/iterate/update)
+    and the enemy broadphase (its queries test the current positions of every blob at once)"""
+
+    # Starting size of the arrays, they double whenever they fill up
+    initial_capacity = 64
+
+    @staticmethod
+    def available():
+        """The engine can only be used if numpy is installed"""
+        return numpy is not None
+
+    def __init__(self, settings, screen, images):
+        """Init an empty population"""
+        super().__init__(settings.enemy_broadphase_cell_size)
+        self.settings = settings
+        self.screen = screen
+        self.screen_rect = screen.get_rect()
+        self.images = images
+        self.width, self.height = images[0].get_size()
+
+        # The blob animations as arrays, built from the table the Blob sprites share so the two
+        # can't drift apart
+        animation_table = Blob(settings, screen, images).get_animation_table()
+        self.animation_names = [settings.anim_name_walk_left, settings.anim_name_walk_right,
+            settings.anim_name_jump_down_left, settings.anim_name_jump_down_right, settings.anim_name_dead]
+        self.animation_ids = {name: index for index, name in enumerate(self.animation_names)}
+        sequences = [animation_table[name].animation for name in self.animation_names]
+        self.animation_ticks_per_frame = numpy.array([animation_table[name].ticks_per_frame for name in self.animation_names])
+        self.animation_lengths = numpy.array([len(sequence) for sequence in sequences])
+        self.animation_frames = numpy.zeros((len(sequences), self.animation_lengths.max()), dtype=numpy.int64)
+        for index, sequence in enumerate(sequences):
+            self.animation_frames[index, :len(sequence)] = sequence
+
+        # Same clock the sprites animate from
+        self.animation_clock = settings.animation_clock
+
+        # Block occupancy, rebuilt when the tilemap's block grid changes
+        self.block_grid = None
+        self.block_grid_version = None
+
+        self.blob_count = 0
+        self.next_spawn_order = 0
+        self.allocate(self.initial_capacity)
+
+    def allocate(self, capacity):
+        """(Re)allocate the arrays, keeping any existing state"""
+        old_arrays = getattr(self, 'arrays', None)
+        self.arrays = {
+            'active': numpy.zeros(capacity, dtype=bool),
+            'spawn_order': numpy.zeros(capacity, dtype=numpy.int64),
+            'left': numpy.zeros(capacity, dtype=numpy.int64),
+            'top': numpy.zeros(capacity, dtype=numpy.int64),
+            'dx': numpy.zeros(capacity),
+            'dy': numpy.zeros(capacity),
+            'falling': numpy.zeros(capacity, dtype=bool),
+            'falling_frames': numpy.zeros(capacity, dtype=numpy.int64),
+            'dying': numpy.zeros(capacity, dtype=bool),
+            'facing_left': numpy.zeros(capacity, dtype=bool),
+            'animation': numpy.zeros(capacity, dtype=numpy.int64),
+            'animation_start_tick': numpy.zeros(capacity, dtype=numpy.int64),
+        }
+        if old_arrays:
+            for name, array in old_arrays.items():
+                self.arrays[name][:len(array)] = array
+        for name, array in self.arrays.items():
+            setattr(self, name, array)
+
+    # Group interface
+
+    def add(self, *blobs):
+        """Take over the state of freshly made Blob sprites (see game_functions.generate_new_random_blob)"""
+        for blob in blobs:
+            free_slots = numpy.flatnonzero(~self.active)
+            if len(free_slots) == 0:
+                slot = len(self.active)
+                self.allocate(slot * 2)
+            else:
+                slot = int(free_slots[0])
+
+            self.active[slot] = True
+            self.spawn_order[slot] = self.next_spawn_order
+            self.next_spawn_order += 1
+            self.left[slot] = blob.rect.left
+            self.top[slot] = blob.rect.top
+            self.dx[slot] = blob.dx
+            self.dy[slot] = blob.dy
+            self.falling[slot] = blob.falling
+            self.falling_frames[slot] = blob.falling_frames
+            self.dying[slot] = blob.dying
+            self.facing_left[slot] = blob.facing_left
+            self.animation[slot] = self.animation_ids[blob.current_animation]
+            self.animation_start_tick[slot] = blob.animation_start_tick
+            self.blob_count += 1
+
+    def remove_slot(self, slot):
+        """Free a slot for reuse"""
+        if self.active[slot]:
+            self.active[slot] = False
+            self.blob_count -= 1
+
+    def empty(self):
+        """Remove every blob"""
+        self.active[:] = False
+        self.blob_count = 0
+
+    def get_slots(self):
+        """Slots of the live blobs, in the order they were added (the same order a Group iterates)"""
+        slots = numpy.flatnonzero(self.active)
+        return slots[numpy.argsort(self.spawn_order[slots], kind='stable')]
+
+    def sprites(self):
+        """Views of the live blobs"""
+        return [BlobView(self, int(slot)) for slot in self.get_slots()]
+
+    def __iter__(self):
+        return iter(self.sprites())
+
+    def __len__(self):
+        return self.blob_count
+
+    def __bool__(self):
+        return self.blob_count > 0
+
+    def get_rects(self):
+        """Rects of every live blob, cheaper than going through the views"""
+        slots = self.get_slots()
+        return [pygame.Rect(left, top, self.width, self.height) for left, top in zip(self.left[slots].tolist(), self.top[slots].tolist())]
+
+    # Broadphase interface, see EnemyBroadphase
+
+    def rebuild(self, enemies):
+        """Nothing to index, queries look at the current positions directly"""
+        pass
+
+    def get_candidates(self, rect):
+        """Views of the blobs overlapping the rect right now, in Group order"""
+        slots = self.get_slots()
+        overlapping = ((self.left[slots] < rect.right) & (self.left[slots] + self.width > rect.left) &
+            (self.top[slots] < rect.bottom) & (self.top[slots] + self.height > rect.top))
+        return [BlobView(self, int(slot)) for slot in slots[overlapping]]
+
+    # Simulation
+
+    def update_block_occupancy(self, tile_map):
+        """Turn the tilemap's block grid into an array of the block order per cell (-1 for none).
+        Blocks are exactly one cell in size and aligned to it, see Tilemap.build_block_grid"""
+        block_grid = tile_map.block_grid
+        if block_grid is self.block_grid and block_grid.version == self.block_grid_version:
+            return
+        self.block_grid = block_grid
+        self.block_grid_version = block_grid.version
+
+        cells = [cell for cell, blocks in block_grid.cells.items() if blocks]
+        if not cells:
+            self.block_cells = numpy.full((1, 1), -1, dtype=numpy.int64)
+            self.block_cells_origin = (0, 0)
+            return
+
+        first_col = min(col for col, row in cells)
+        first_row = min(row for col, row in cells)
+        last_col = max(col for col, row in cells)
+        last_row = max(row for col, row in cells)
+        self.block_cells = numpy.full((last_col - first_col + 1, last_row - first_row + 1), -1, dtype=numpy.int64)
+        self.block_cells_origin = (first_col, first_row)
+        for (col, row), blocks in block_grid.cells.items():
+            if blocks:
+                self.block_cells[col - first_col, row - first_row] = block_grid.order[blocks[0]]
+
+    def collide_blocks(self, tile_map, slots):
+        """For each slot, the number of blocks it overlaps and the rect (left, top, right) of the first one"""
+        self.update_block_occupancy(tile_map)
+        block_grid = self.block_grid
+        cell_width = block_grid.cell_width
+        cell_height = block_grid.cell_height
+        first_col = (self.left[slots] - block_grid.origin[0]) // cell_width
+        last_col = (self.left[slots] + self.width - 1 - block_grid.origin[0]) // cell_width
+        first_row = (self.top[slots] - block_grid.origin[1]) // cell_height
+        last_row = (self.top[slots] + self.height - 1 - block_grid.origin[1]) // cell_height
+
+        no_block = numpy.iinfo(numpy.int64).max
+        hit_count = numpy.zeros(len(slots), dtype=numpy.int64)
+        first_order = numpy.full(len(slots), no_block, dtype=numpy.int64)
+        first_cell_col = numpy.zeros(len(slots), dtype=numpy.int64)
+        first_cell_row = numpy.zeros(len(slots), dtype=numpy.int64)
+        grid_cols, grid_rows = self.block_cells.shape
+
+        # A blob covers at most a few cells in each direction, so walk the offsets rather than the blobs
+        span_cols = int((last_col - first_col).max()) + 1 if len(slots) else 0
+        span_rows = int((last_row - first_row).max()) + 1 if len(slots) else 0
+        for row_offset in range(0, span_rows):
+            for col_offset in range(0, span_cols):
+                col = first_col + col_offset
+                row = first_row + row_offset
+                grid_col = col - self.block_cells_origin[0]
+                grid_row = row - self.block_cells_origin[1]
+                valid = ((col <= last_col) & (row <= last_row) & (grid_col >= 0) & (grid_col < grid_cols) &
+                    (grid_row >= 0) & (grid_row < grid_rows))
+                order = numpy.full(len(slots), -1, dtype=numpy.int64)
+                order[valid] = self.block_cells[grid_col[valid], grid_row[valid]]
+                hit = order >= 0
+                hit_count += hit
+                earlier = hit & (order < first_order)
+                first_order[earlier] = order[earlier]
+                first_cell_col[earlier] = col[earlier]
+                first_cell_row[earlier] = row[earlier]
+
+        block_left = first_cell_col * cell_width + block_grid.origin[0]
+        block_top = first_cell_row * cell_height + block_grid.origin[1]
+        return hit_count, block_left, block_top, block_left + cell_width
+
+    def update(self, tile_map):
+        """Advance every blob one frame, see Blob.update/AnimatedSprite.update for the per-object logic"""
+        if self.blob_count == 0:
+            return
+
+        settings = self.settings
+        bounds = tile_map.player_bounds_rect
+        half_width = self.width // 2
+        half_height = self.height // 2
+        slots = numpy.flatnonzero(self.active)
+
+        dying = self.dying[slots]
+        walking = slots[~dying]
+        falling_to_death = slots[dying]
+
+        # -- Blobs that aren't dying: physics, bounds, blocks, walls and the drain --
+        last_dx = self.dx[walking].copy()
+
+        # AnimatedSprite.apply_physics
+        start_falling = walking[(self.top[walking] + self.height < bounds.bottom) & ~self.falling[walking]]
+        self.falling[start_falling] = True
+        self.falling_frames[start_falling] = 1
+        falling = walking[self.falling[walking]]
+        self.dy[falling[self.dy[falling] < settings.terminal_velocity]] += settings.gravity
+        self.top[falling] = rect_round(self.top[falling] + half_height + self.dy[falling]) - half_height
+        self.falling_frames[falling] += 1
+
+        # AnimatedSprite.basic_bounds_containment (blobs have no margins)
+        below = walking[self.top[walking] + self.height > bounds.bottom]
+        self.top[below] = bounds.bottom - self.height
+        self.dy[below] = 0.0
+        self.falling[below] = False
+
+        right = walking[self.dx[walking] > 0]
+        self.left[right] = rect_round(self.left[right] + half_width + self.dx[right]) - half_width
+        right = right[self.left[right] + self.width > bounds.right]
+        self.left[right] = bounds.right - self.width
+        self.dx[right] = 0.0
+
+        left = walking[self.dx[walking] < 0]
+        self.left[left] = rect_round(self.left[left] + half_width + self.dx[left]) - half_width
+        left = left[self.left[left] < bounds.left]
+        self.left[left] = bounds.left
+        self.dx[left] = 0.0
+
+        # Blob.handle_collision, land on 2+ blocks, or on 1 block if we're not walking off its edge
+        hit_count, block_left, block_top, block_right = self.collide_blocks(tile_map, walking)
+        facing_left = self.facing_left[walking]
+        one_block = (hit_count == 1) & ((facing_left & (self.left[walking] + self.width > block_left)) |
+            (~facing_left & (self.left[walking] < block_right)))
+        landed = (hit_count > 1) | one_block
+        landed_slots = walking[landed]
+        self.falling[landed_slots] = False
+        self.falling_frames[landed_slots] = 1
+        self.dy[landed_slots] = 0
+        self.top[landed_slots] = block_top[landed] - self.height
+
+        # Blobs only stop when they hit a wall so reverse course (see Blob.update)
+        reversed_slots = walking[(last_dx != 0) & (self.dx[walking] == 0)]
+        self.facing_left[reversed_slots] = ~self.facing_left[reversed_slots]
+        self.dx[reversed_slots] = numpy.where(self.facing_left[reversed_slots], 1.0, -1.0)
+
+        # Over the drain, drop it down
+        drain = tile_map.drainrect
+        if drain.width > 0 and drain.height > 0:
+            drained = walking[(self.left[walking] < drain.right) & (self.left[walking] + self.width > drain.left) &
+                (self.top[walking] < drain.bottom) & (self.top[walking] + self.height > drain.top)]
+            self.dying[drained] = True
+            self.falling[drained] = True
+            self.falling_frames[drained] = 1
+
+        # -- Dying blobs just fall until they are off the screen --
+        self.dy[falling_to_death[self.dy[falling_to_death] < settings.terminal_velocity]] += settings.gravity
+        self.top[falling_to_death] = rect_round(self.top[falling_to_death] + half_height + self.dy[falling_to_death]) - half_height
+        self.falling_frames[falling_to_death] += 1
+        gone = falling_to_death[self.top[falling_to_death] > self.screen_rect.bottom]
+        self.active[gone] = False
+        self.blob_count -= len(gone)
+
+        self.update_animations(numpy.flatnonzero(self.active))
+
+    def update_animations(self, slots):
+        """Blob.update_current_animation for each slot"""
+        ids = self.animation_ids
+        settings = self.settings
+        dy = self.dy[slots]
+        target = self.animation[slots].copy()
+        target[dy > 0] = numpy.where(self.facing_left[slots][dy > 0], ids[settings.anim_name_jump_down_left], ids[settings.anim_name_jump_down_right])
+        target[dy == 0] = numpy.where(self.dx[slots][dy == 0] < 0, ids[settings.anim_name_walk_left], ids[settings.anim_name_walk_right])
+        target[self.dying[slots]] = ids[settings.anim_name_dead]
+
+        # Switching animation restarts it
+        changed = slots[target != self.animation[slots]]
+        self.animation[slots] = target
+        self.animation_start_tick[changed] = self.animation_clock.tick
+
+    def draw_slots(self, slots):
+        """Blit the current frame of each slot in one batch"""
+        # Animation.get_frame for each slot
+        animations = self.animation[slots]
+        ticks = self.animation_clock.tick - self.animation_start_tick[slots]
+        indicies = (ticks // self.animation_ticks_per_frame[animations]) % self.animation_lengths[animations]
+        frames = self.animation_frames[animations, indicies].tolist()
+        lefts = self.left[slots].tolist()
+        tops = self.top[slots].tolist()
+        images = self.images
+        self.screen.blits([(images[frame], (left, top)) for frame, left, top in zip(frames, lefts, tops)], False)
+
+    def draw(self):
+        """Draw every live blob, in Group order"""
+        if self.blob_count:
+            self.draw_slots(self.get_slots())
@@ -1,13 +1,15 @@
 """This module implements the exit for blob sprites on the map"""
 from src.particle_generator import ParticleGenerator
+from src.particle_engine import ParticleEngine
 from src.animation import Animation
 from src.animated_sprite import AnimatedSprite
-import random
 
 class BlobExit(AnimatedSprite):
     """This class encapsulates the animated blade and the gibbing 
     generator when an enemy sprite is dropped into the drain"""
 
+    __slots__ = ('tile_map', 'particle_gen', 'particles_frames_max')
+
     def __init__(self, settings, screen, images, tile_map):
         """Initialize the animated blade and the particle generator for the map"""
         # AnimatedSprite init
@@ -21,14 +23,18 @@ class BlobExit(AnimatedSprite):
         self.rect.move_ip(self.screen_rect.width /2 - settings.tile_width, self.tile_map.player_bounds_rect.bottom + self.settings.tile_height)
         
         # only 1 animation, could add a "bloody" one
-        self.animations[self.settings.anim_name_exit] = Animation([0, 1], 1)
         self.current_animation = self.settings.anim_name_exit
 
         # Blob gibs
         # Leaving the callback out of this call 'self.generate_particles' will take the default behavior
         # which is randomized differently.  Add a comment to see e.g.
         # ..., settings, settings.particle_gen_color, 0, 0)#, self.generate_particles)
-        self.particle_gen = ParticleGenerator(screen, settings, settings.particle_gen_color, 0, 0, self.generate_particles)
+        # The vectorized engine has the same interface, but needs numpy
+        if settings.particle_engine_vectorized and ParticleEngine.available():
+            generator_class = ParticleEngine
+        else:
+            generator_class = ParticleGenerator
+        self.particle_gen = generator_class(screen, settings, settings.particle_gen_color, 0, 0, self.generate_particles)
         self.particle_gen.x = self.screen_rect.centerx - self.settings.tile_width / 2
         self.particle_gen.y = self.screen_rect.bottom - self.settings.tile_width / 2
 
@@ -45,6 +51,7 @@ class BlobExit(AnimatedSprite):
         # This callback allows us to provide specific behavior for the generator without deriving
         # a new class (which is also a valid option)
         new_particle_data = []
+        rng = self.settings.rng.particles
         dx_a = self.settings.particle_gen_dx_range[0]
         dx_b = self.settings.particle_gen_dx_range[1]
         dy_a = self.settings.particle_gen_dy_range[0]
@@ -52,7 +59,7 @@ class BlobExit(AnimatedSprite):
         
         # Count per frame should be fairly low
         for particle_index in range(0, self.settings.particle_gen_per_frame):
-            new_data = (random.randint(dx_a, dx_b), random.randint(dy_a, dy_b) * -1, self.settings.particle_gen_color)
+            new_data = (rng.randint(dx_a, dx_b), rng.randint(dy_a, dy_b) * -1, self.settings.particle_gen_color)
             new_particle_data.append(new_data)
 
         return new_particle_data
@@ -75,10 +82,19 @@ class BlobExit(AnimatedSprite):
         """Update - mostly look for new enemies to gib"""
         # Let the particle generator update itself
         self.particle_gen.update()
-        super().update(self.tile_map, self.tile_map.enemies)
+        super().update(self.tile_map)
+
+        # The enemies have moved since the broadphase was built this frame, widen the search
+        # by the furthest a blob can move in one update
+        margin = int(self.settings.terminal_velocity + self.settings.gravity + abs(self.settings.enemy_blob_dx)) + 1
+        self.handle_collision(self.tile_map.enemy_broadphase.collide_rect(self.rect, margin, 'blade'), self.tile_map.enemies)
         # common animated sprite code
         self.finish_update()
 
+    def create_animations(self):
+        """The spinning blade"""
+        return {self.settings.anim_name_exit: Animation([0, 1], 1)}
+
     def update_current_animation(self):
         """This never updates as there is only 1 animation"""
         pass
@@ -0,0 +1,49 @@
+"""This module implements a fixed capacity pool of blob enemies for Py-Climber"""
+from src.blob_enemy import Blob
+
+class BlobPool():
+    """Blobs are recycled rather than built from scratch (the Sprite and its group bookkeeping) every time one
+    spawns.  The capacity doubles as the population cap, once that many blobs are alive new spawns
+    are rejected.  The high-water mark and rejected spawns are tracked to help tune the cap"""
+
+    def __init__(self, settings, screen, images, capacity):
+        """Init an empty pool, blobs are only created on demand"""
+        self.settings = settings
+        self.screen = screen
+        self.images = images
+        self.capacity = capacity
+        self.free = []
+        self.created = 0
+        self.recycled = 0
+        self.rejected = 0
+        self.high_water = 0
+
+    def acquire(self, population):
+        """Returns a blob ready to be positioned, or None if population (the number of blobs alive)
+        is already at the cap"""
+        if population >= self.capacity:
+            self.rejected += 1
+            return None
+
+        self.high_water = max(self.high_water, population + 1)
+        if self.free:
+            blob = self.free.pop()
+            blob.reset()
+            self.recycled += 1
+        else:
+            blob = Blob(self.settings, self.screen, self.images)
+            blob.pool = self
+            self.created += 1
+        blob.pooled = False
+        return blob
+
+    def release(self, blob):
+        """Return a blob that is no longer in play, it is reset when it's next acquired"""
+        if not blob.pooled:
+            blob.pooled = True
+            self.free.append(blob)
+
+    def get_stats(self):
+        """Returns the counters as a dict, handy for logging"""
+        return {'capacity': self.capacity, 'free': len(self.free), 'created': self.created,
+            'recycled': self.recycled, 'rejected': self.rejected, 'high_water': self.high_water}
@@ -3,20 +3,18 @@ import pygame
 from pygame.sprite import Sprite
 
 class Block(Sprite):
-    """Block object"""
+    """Block object, a level has hundreds of these so it only keeps its image and position"""
 
-    def __init__(self, settings, screen, image):
+    __slots__ = ('image', 'rect', 'dying')
+
+    def __init__(self, image):
         """Initialize the block, not much to do other than save the params"""
         super().__init__()
-        self.settings = settings
-        self.screen = screen
         self.image = image
         self.rect = self.image.get_rect()
-        self.screen_rect = screen.get_rect()
         self.dying = False
 
     # 'draw' is required by pygame.Sprite.Group for drawing in batches
-    def draw(self):
+    def draw(self, screen):
         """Draws the block at its current position on the screen"""
-        self.screen.blit(self.image, self.rect)
-        
\ No newline at end of file
+        screen.blit(self.image, self.rect)
@@ -0,0 +1,79 @@
+"""This module implements a grid index over the platform blocks for Py-Climber"""
+
+class BlockGrid():
+    """Blocks never move and sit on a fixed grid (see Tilemap.generate_platforms), so rather than
+    checking a sprite against every block, look up just the grid cells its rect overlaps"""
+
+    def __init__(self, origin, cell_width, cell_height):
+        """Init an empty grid, cells are cell_width x cell_height starting at origin (x, y)"""
+        self.origin = origin
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        # (col, row) -> list of blocks overlapping that cell
+        self.cells = {}
+        # block -> insertion number, so results come back in the same order as the block Group
+        self.order = {}
+        self.next_order = 0
+        # Bumped on every change, so anything derived from the grid knows when it's stale
+        self.version = 0
+
+    def get_cell_range(self, rect):
+        """Returns the (first col, last col, first row, last row) of the cells the rect overlaps"""
+        left = rect.left - self.origin[0]
+        top = rect.top - self.origin[1]
+        return (left // self.cell_width, (left + rect.width - 1) // self.cell_width, 
+            top // self.cell_height, (top + rect.height - 1) // self.cell_height)
+
+    def clear(self):
+        """Remove all blocks"""
+        self.cells.clear()
+        self.order.clear()
+        self.next_order = 0
+        self.version += 1
+
+    def add(self, block):
+        """Add a block to every cell it overlaps"""
+        self.order[block] = self.next_order
+        self.next_order += 1
+        self.version += 1
+        first_col, last_col, first_row, last_row = self.get_cell_range(block.rect)
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                self.cells.setdefault((col, row), []).append(block)
+
+    def remove(self, block):
+        """Remove a block, blocks only ever cover a cell or two so this is constant time"""
+        if self.order.pop(block, None) is None:
+            return
+        self.version += 1
+        first_col, last_col, first_row, last_row = self.get_cell_range(block.rect)
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                cell = self.cells.get((col, row))
+                if cell:
+                    cell.remove(block)
+                    if not cell:
+                        del self.cells[(col, row)]
+
+    def collide(self, sprite, collided=None):
+        """Same result as pygame.sprite.spritecollide(sprite, block_group, False, collided),
+        including the order, but only looks at the blocks in the cells the sprite overlaps"""
+        first_col, last_col, first_row, last_row = self.get_cell_range(sprite.rect)
+        candidates = []
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                cell = self.cells.get((col, row))
+                if cell:
+                    candidates.extend(cell)
+
+        if not candidates:
+            return []
+
+        # A block can show up in more than one cell if it isn't aligned to the grid
+        if len(candidates) > 1:
+            candidates = sorted(set(candidates), key=self.order.__getitem__)
+
+        if collided:
+            return [block for block in candidates if collided(sprite, block)]
+        sprite_rect = sprite.rect
+        return [block for block in candidates if sprite_rect.colliderect(block.rect)]
@@ -0,0 +1,81 @@
+"""This module implements the batched (lockstep) agent environment for Py-Climber"""
+
+import os
+import pygame
+import random
+from pyclimber import create_screen
+from src.climber_env import ClimberEnv
+from src.observation_builder import ObservationBuilder
+from src.settings import Settings
+
+# numpy is optional, but the batch returns its results as arrays
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class ClimberBatchEnv():
+    """Runs N independent games in one process, stepped together.  Each game has its own player,
+    blobs, blocks, timer and random streams (see Settings.copy_for_game), while pygame, the
+    screen, the images and the fonts are set up once and shared.  step(actions) plays one action
+    per game and returns the observations stacked into one set of arrays (each game's
+    ObservationBuilder fills its own slice in place), along with arrays of the rewards and done
+    flags.  A game whose episode ends starts its next one straight away"""
+
+    @staticmethod
+    def available():
+        """The batch can only be used if numpy is installed"""
+        return numpy is not None
+
+    def __init__(self, count, settings=None):
+        """Init pygame once and create the games, nothing is drawn"""
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        # SDL's SIGTERM handler would stop a process pool from shutting its workers down
+        os.environ.setdefault('SDL_NO_SIGNAL_HANDLERS', '1')
+        pygame.init()
+
+        if settings is None:
+            settings = Settings()
+        settings.render_enabled = False
+        self.settings = settings
+        self.count = count
+        screen = create_screen(settings)
+
+        self.envs = [ClimberEnv(settings.copy_for_game(), screen=screen) for index in range(0, count)]
+
+        # Point each game's observation at its slice of the stacked arrays
+        self.observation = ObservationBuilder.create_buffers(settings, self.envs[0].tile_map, (count,))
+        for index, env in enumerate(self.envs):
+            buffers = {name: array[index, ...] for name, array in self.observation.items()}
+            env.observation_builder = ObservationBuilder(env.settings, env.tile_map, buffers)
+
+        self.rewards = numpy.zeros(count, dtype=numpy.float32)
+        self.dones = numpy.zeros(count, dtype=bool)
+        # The seed each game's current episode was started from
+        self.seeds = [None] * count
+
+    def reset(self, seed=None):
+        """Start a new episode in every game, game i on seed + i (a random base seed if None),
+        returns the stacked observations"""
+        if seed is None:
+            seed = random.SystemRandom().randrange(0, 2 ** 32)
+        for index, env in enumerate(self.envs):
+            self.seeds[index] = seed + index
+            env.reset(self.seeds[index])
+        return self.observation
+
+    def step(self, actions):
+        """Play one action per game, returns (observations, rewards, dones, infos).  When a game's
+        episode ends, its info holds a copy of the final observation under 'final_observation' and
+        the observation returned is the first of its next episode, on seed + count"""
+        infos = []
+        for index, env in enumerate(self.envs):
+            observation, reward, done, info = env.step(int(actions[index]))
+            if done:
+                info['final_observation'] = {name: array.copy() for name, array in observation.items()}
+                self.seeds[index] += self.count
+                env.reset(self.seeds[index])
+            self.rewards[index] = reward
+            self.dones[index] = done
+            infos.append(info)
+        return self.observation, self.rewards, self.dones, infos
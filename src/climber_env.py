@@ -0,0 +1,147 @@
+"""This module implements the reset/step environment around Py-Climber, for training and evaluating agents"""
+
+import os
+import pygame
+import src.game_functions as gf
+from pyclimber import create_game, create_tile_map
+from src.game_loop import GameLoop
+from src.observation_builder import ObservationBuilder
+from src.settings import Settings
+
+class ClimberEnv():
+    """Runs the game one step at a time for an agent, in the style of a gym environment.  reset(seed)
+    starts an episode on the map generated from the seed, and step(action) plays the action through
+    the same key handlers as the keyboard, runs the simulation and returns the rewards.  Nothing is
+    drawn unless render is set, so a step costs only the updates"""
+
+    # Walking and jumping, alone or together.  A direction is held (like a key) until an action
+    # without it, a jump is a press and release of SPACE
+    action_noop = 0
+    action_left = 1
+    action_right = 2
+    action_jump = 3
+    action_left_jump = 4
+    action_right_jump = 5
+    action_count = 6
+
+    action_keys = {
+        action_noop: (None, False),
+        action_left: (pygame.K_LEFT, False),
+        action_right: (pygame.K_RIGHT, False),
+        action_jump: (None, True),
+        action_left_jump: (pygame.K_LEFT, True),
+        action_right_jump: (pygame.K_RIGHT, True),
+    }
+
+    def __init__(self, settings=None, render=False, screen=None):
+        """Init pygame and create the game, without a window unless rendering.  Given a screen
+        (and settings made by Settings.copy_for_game), the game joins the others already running
+        in the process and shares their images and fonts, see ClimberBatchEnv"""
+        if screen is None:
+            if not render:
+                os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+                # SDL's SIGTERM handler would stop a process pool from shutting its workers down
+                os.environ.setdefault('SDL_NO_SIGNAL_HANDLERS', '1')
+            pygame.init()
+
+            if settings is None:
+                settings = Settings()
+            settings.render_enabled = render
+            self.screen, self.tile_map = create_game(settings)
+        else:
+            self.screen = screen
+            self.tile_map = create_tile_map(settings, screen)
+        self.settings = settings
+        self.game_loop = GameLoop(settings, self.screen, self.tile_map)
+        self.observation_builder = None
+        if ObservationBuilder.available():
+            self.observation_builder = ObservationBuilder(settings, self.tile_map)
+
+        # The direction key being held, and the totals the rewards are the change in
+        self.held_key = None
+        self.ticks = 0
+        self.totals = (0, 0, 0)
+
+    def reset(self, seed=None, level=None):
+        """Start a new episode on the map for the seed (random if None), returns the first observation.
+        Given a saved level (e.g. from a LevelPack) the episode starts on it instead, seeded with the
+        level's seed unless another is given"""
+        if seed is None and level is not None:
+            seed = level.seed
+        self.settings.rng.seed(seed)
+        self.tile_map.reset(level)
+        self.held_key = None
+        self.ticks = 0
+        self.totals = self.get_totals()
+        return self.get_observation()
+
+    def get_totals(self):
+        """(levels cleared, player deaths, blobs killed) since the reset"""
+        tile_map = self.tile_map
+        return (tile_map.levels_cleared, tile_map.player_deaths, tile_map.blobs_killed)
+
+    def get_observation(self):
+        """The state arrays filled in place by the ObservationBuilder, or without numpy a summary of
+        the player's state and surroundings"""
+        if self.observation_builder is not None:
+            return self.observation_builder.build()
+
+        tile_map = self.tile_map
+        player = tile_map.player
+        return {
+            'player': (player.rect.x, player.rect.y, float(player.dx), float(player.dy), player.falling, player.dying, player.idle_top),
+            'enemies': len(tile_map.enemies),
+            'blocks': len(tile_map.block_group),
+            'level': tile_map.levels_cleared + 1,
+            'elapsed_ms': tile_map.level_timer.elapsed_time_ms,
+        }
+
+    def send_key(self, event_type, key):
+        """Handle a key event as if it came from the keyboard"""
+        event = pygame.event.Event(event_type, key=key, mod=0, unicode='', scancode=0)
+        gf.handle_key_event(self.settings, event, self.screen, self.tile_map)
+
+    def apply_action(self, action):
+        """Press and release the keys that turn the held keys into the action's"""
+        direction_key, jump = self.action_keys[action]
+        if self.held_key is not None and self.held_key != direction_key:
+            self.send_key(pygame.KEYUP, self.held_key)
+        # Pressed again while held, walking into a wall stops the player like releasing it does
+        if direction_key is not None:
+            self.send_key(pygame.KEYDOWN, direction_key)
+        self.held_key = direction_key
+
+        if jump:
+            self.send_key(pygame.KEYDOWN, pygame.K_SPACE)
+            self.send_key(pygame.KEYUP, pygame.K_SPACE)
+
+    def step(self, action):
+        """Play the action for settings.env_ticks_per_step ticks, returns (observation, reward, done, info)"""
+        settings = self.settings
+        self.apply_action(action)
+        for tick in range(0, settings.env_ticks_per_step):
+            self.game_loop.step()
+            self.ticks += 1
+            if settings.render_enabled:
+                # Keep the window responsive
+                pygame.event.pump()
+                self.game_loop.render()
+
+        # The rewards come from the change in the totals
+        totals = self.get_totals()
+        levels_won, player_died, blobs_killed = [now - before for now, before in zip(totals, self.totals)]
+        self.totals = totals
+        reward = (levels_won * settings.env_reward_level_won + player_died * settings.env_reward_player_died +
+            blobs_killed * settings.env_reward_blob_killed + settings.env_ticks_per_step * settings.env_reward_per_tick)
+
+        won_all = settings.env_level_limit and totals[0] >= settings.env_level_limit
+        out_of_time = settings.env_max_ticks and self.ticks >= settings.env_max_ticks
+        info = {
+            'level_won': levels_won,
+            'player_died': player_died,
+            'blobs_killed': blobs_killed,
+            'time_ms': self.ticks * settings.simulation_tick_ms,
+            'ticks': self.ticks,
+            'truncated': bool(out_of_time and not won_all),
+        }
+        return self.get_observation(), reward, bool(won_all or out_of_time), info
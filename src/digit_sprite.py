@@ -4,6 +4,8 @@ from src.flyin_sprite import FlyInSprite
 class DigitSprite(FlyInSprite):
     """Digit sprite object which can also flyin to position"""
 
+    __slots__ = ('images', 'image_index')
+
     def __init__(self, settings, screen, images, digit=0):
         """Init the sprite"""
         super().__init__(settings, screen, images[0])
@@ -12,7 +14,6 @@ class DigitSprite(FlyInSprite):
         self.images = images
         self.image_index = 0
         self.set_digit(digit)
-        self.screen_rect = screen.get_rect()
         self.rect = self.images[self.image_index].get_rect()
 
 
@@ -0,0 +1,141 @@
+"""This module implements an optional dirty-rectangle renderer for Py-Climber"""
+
+import src.game_functions as gf
+import pygame
+
+class DirtyRectRenderer():
+    """Instead of clearing and flipping the whole screen every frame, this renderer tracks
+    the rects every moving object covered last frame and this frame, restores just those
+    regions from the tilemap's cached layers and pushes them to the display with pygame.display.update(rects)"""
+
+    def __init__(self, settings, screen, tile_map):
+        """Init the renderer, nothing is drawn until the first call to draw()"""
+        self.settings = settings
+        self.screen = screen
+        self.screen_rect = screen.get_rect()
+        self.tile_map = tile_map
+
+        # The tile and block layers the screen was last fully drawn with, both are owned by
+        # the tilemap and sit on top of the enemies
+        self.tile_layer = None
+        self.block_layer = None
+
+        # Rects covered by the dynamic objects on the previous frame
+        self.last_rects = []
+        self.full_redraw = True
+
+        # The help text never moves, but anything passing over it needs it redrawn
+        self.help_rect = gf.get_help_text_rect(settings, screen).clip(self.screen_rect)
+
+    def invalidate(self):
+        """Force a full redraw on the next frame, e.g. after the display mode changes"""
+        self.full_redraw = True
+
+    def restore_static_layers(self, rect):
+        """Blit the parts of the tile and block layers that fall inside the rect"""
+        tile_map = self.tile_map
+        for layer, layer_rect in ((self.tile_layer, tile_map.tile_layer_rect), (self.block_layer, tile_map.block_layer_rect)):
+            if layer:
+                clipped_rect = rect.clip(layer_rect)
+                if clipped_rect.width > 0 and clipped_rect.height > 0:
+                    self.screen.blit(layer, clipped_rect, clipped_rect.move(-layer_rect.left, -layer_rect.top))
+
+    def collect_rects(self):
+        """Gather the rects of everything that can move or change this frame"""
+        tile_map = self.tile_map
+        if tile_map.blob_engine is not None:
+            rects = tile_map.blob_engine.get_rects()
+        else:
+            rects = [enemy.rect.copy() for enemy in tile_map.enemies]
+        rects.append(tile_map.player.rect.copy())
+        rects.append(tile_map.blob_exit.rect.copy())
+
+        rects.extend(tile_map.blob_exit.particle_gen.get_rects())
+
+        # HUD
+        level_info = tile_map.level_info
+        rects.append(level_info.level_sprite.rect.copy())
+        rects.append(level_info.digit_tens.rect.copy())
+        rects.append(level_info.digit_ones.rect.copy())
+        rects.append(tile_map.level_timer.rect.copy())
+
+        # Bonus text is anti-aliased, so pad it as well
+        for bonus in tile_map.bonuses:
+            rects.append(bonus.text_rect.inflate(4, 4))
+
+        return rects
+
+    def draw_full(self):
+        """Redraw the whole frame, used on the first frame and whenever the static layer changes"""
+        self.screen.fill(self.settings.bg_color)
+        self.tile_map.draw_enemies()
+        self.tile_map.draw_tiles()
+        self.tile_map.draw_foreground()
+        gf.blit_help_text(self.settings, self.screen)
+        gf.draw_profiler_overlay(self.settings, self.screen)
+        pygame.display.flip()
+        self.full_redraw = False
+
+    def draw_help_text(self, dirty_rects):
+        """Redraw the help text inside any restored regions it overlaps"""
+        surface, help_rect = gf.get_help_text_surface(self.settings, self.screen)
+        help_dirty_rects = [rect.clip(help_rect) for rect in dirty_rects if rect.colliderect(help_rect)]
+        if not help_dirty_rects:
+            return
+
+        # Dirty rects can overlap and blending the anti-aliased text twice would smear it, so
+        # blend it once onto a scratch copy and copy back only the restored parts
+        scratch = self.screen.subsurface(help_rect).copy()
+        scratch.blit(surface, (0, 0))
+        for rect in help_dirty_rects:
+            self.screen.blit(scratch, rect, rect.move(-help_rect.left, -help_rect.top))
+
+    def draw(self):
+        """Draw the frame, restoring and pushing only the regions that changed"""
+        # A rebuilt tile or block layer (new level, new map) means the whole screen changed
+        tile_map = self.tile_map
+        tile_layer = tile_map.get_tile_layer()
+        if tile_layer is not self.tile_layer or tile_map.block_layer is not self.block_layer:
+            self.tile_layer = tile_layer
+            self.block_layer = tile_map.block_layer
+            self.full_redraw = True
+
+        rects = self.collect_rects()
+        if self.full_redraw:
+            self.draw_full()
+            tile_map.removed_block_rects.clear()
+            overlay_rect = self.settings.profiler.get_overlay_rect(self.screen)
+            if overlay_rect.width > 0:
+                rects.append(overlay_rect)
+            self.last_rects = rects
+            return
+
+        # Anything covered last frame or this frame has to be restored, as do destroyed blocks
+        dirty_rects = []
+        for rect in self.last_rects + rects + tile_map.removed_block_rects:
+            rect = rect.clip(self.screen_rect)
+            if rect.width > 0 and rect.height > 0:
+                dirty_rects.append(rect)
+        tile_map.removed_block_rects.clear()
+
+        screen = self.screen
+        for rect in dirty_rects:
+            screen.fill(self.settings.bg_color, rect)
+
+        # Same layering as Tilemap.draw, enemies then the tiles and blocks then the foreground
+        tile_map.draw_enemies()
+        for rect in dirty_rects:
+            self.restore_static_layers(rect)
+        tile_map.draw_foreground()
+
+        self.draw_help_text(dirty_rects)
+
+        # The profiler overlay is opaque and drawn whole, it just has to be pushed, and restored once it's gone
+        gf.draw_profiler_overlay(self.settings, screen)
+        overlay_rect = self.settings.profiler.get_overlay_rect(screen)
+        if overlay_rect.width > 0:
+            dirty_rects.append(overlay_rect)
+            rects.append(overlay_rect)
+
+        pygame.display.update(dirty_rects)
+        self.last_rects = rects
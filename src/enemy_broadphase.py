@@ -0,0 +1,80 @@
+"""This module implements a broadphase for collisions against the enemies in Py-Climber"""
+
+class EnemyBroadphase():
+    """A uniform grid over the enemies, rebuilt once per frame by the tilemap.  Queries only look
+    at the enemies in the cells a rect overlaps rather than every enemy on the map.  Counters
+    for candidates checked vs actual hits are kept per query name to see how well it culls"""
+
+    def __init__(self, cell_size):
+        """Init an empty broadphase with square cells of cell_size pixels"""
+        self.cell_size = cell_size
+        # (col, row) -> list of enemies overlapping that cell
+        self.cells = {}
+        # enemy -> position in the enemies Group, so results keep the Group's order
+        self.order = {}
+        # query name -> [queries, candidates, hits]
+        self.stats = {}
+
+    def get_cell_range(self, rect):
+        """Returns the (first col, last col, first row, last row) of the cells the rect overlaps"""
+        size = self.cell_size
+        return (rect.left // size, (rect.right - 1) // size, rect.top // size, (rect.bottom - 1) // size)
+
+    def rebuild(self, enemies):
+        """Index the enemies at their current positions"""
+        self.cells.clear()
+        self.order.clear()
+        for index, enemy in enumerate(enemies):
+            self.order[enemy] = index
+            first_col, last_col, first_row, last_row = self.get_cell_range(enemy.rect)
+            for row in range(first_row, last_row + 1):
+                for col in range(first_col, last_col + 1):
+                    self.cells.setdefault((col, row), []).append(enemy)
+
+    def get_candidates(self, rect):
+        """Enemies whose rect (when the broadphase was built) may overlap the given rect, in Group order"""
+        first_col, last_col, first_row, last_row = self.get_cell_range(rect)
+        candidates = []
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                cell = self.cells.get((col, row))
+                if cell:
+                    candidates.extend(cell)
+
+        # Enemies can span more than one cell
+        if len(candidates) > 1:
+            candidates = sorted(set(candidates), key=self.order.__getitem__)
+        return candidates
+
+    def count(self, query_name, candidates, hits):
+        """Add to the counters for the named query"""
+        stats = self.stats.setdefault(query_name, [0, 0, 0])
+        stats[0] += 1
+        stats[1] += len(candidates)
+        stats[2] += len(hits)
+
+    def collide_sprite(self, sprite, collided=None, query_name='sprite'):
+        """Same result as pygame.sprite.spritecollide(sprite, enemies, False, collided)"""
+        candidates = self.get_candidates(sprite.rect)
+        if collided:
+            hits = [enemy for enemy in candidates if collided(sprite, enemy)]
+        else:
+            hits = [enemy for enemy in candidates if sprite.rect.colliderect(enemy.rect)]
+        self.count(query_name, candidates, hits)
+        return hits
+
+    def collide_rect(self, rect, margin=0, query_name='rect'):
+        """Enemies overlapping the rect, checked against their current positions.  margin widens the
+        search for enemies that may have moved up to that many pixels since the last rebuild"""
+        candidates = self.get_candidates(rect.inflate(margin * 2, margin * 2))
+        hits = [enemy for enemy in candidates if enemy.alive() and rect.colliderect(enemy.rect)]
+        self.count(query_name, candidates, hits)
+        return hits
+
+    def get_stats(self):
+        """Returns {query name: {'queries', 'candidates', 'hits'}} for logging"""
+        return {name: {'queries': stats[0], 'candidates': stats[1], 'hits': stats[2]} for name, stats in self.stats.items()}
+
+    def reset_stats(self):
+        """Zero the counters"""
+        self.stats.clear()
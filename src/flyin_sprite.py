@@ -4,6 +4,10 @@ from pygame.sprite import Sprite
 
 class FlyInSprite(Sprite):
     """A static image sprite that moves to a final position over a number of frames"""
+
+    __slots__ = ('settings', 'screen', 'image', 'rect', 'dx', 'dy', 'target_top', 'target_left', 'start_top',
+        'start_left', 'frames_max', 'frame_current')
+
     def __init__(self, settings, screen, image):
         """Init the sprite base class"""
         super().__init__()
@@ -11,7 +15,6 @@ class FlyInSprite(Sprite):
         # cache these objects
         self.settings = settings
         self.screen = screen
-        self.screen_rect = self.screen.get_rect()
         self.image = image
         self.rect = self.image.get_rect()
         self.dx = 0.0
@@ -23,6 +26,11 @@ class FlyInSprite(Sprite):
         self.frames_max = 0
         self.frame_current = 0
 
+    @property
+    def screen_rect(self):
+        """The screen's rect, asked for when needed rather than a copy kept by every sprite"""
+        return self.screen.get_rect()
+
     def set_start_position(self, top, left, dx, dy, frames):
         """Sets the initial position and state of the sprite.  It can be off-screen"""
         self.start_left = left
@@ -0,0 +1,112 @@
+"""This module implements the frame stage profiler and its overlay for Py-Climber"""
+
+import collections
+import time
+import pygame
+
+class FrameProfiler():
+    """Times the stages of a frame (events, update, draw, flip) and the sub-steps of the tilemap's
+    update and draw, keeping a rolling window of samples per stage.  The overlay shows the average,
+    p95 and p99 of each stage along with live object counts.  While it's off begin() and end()
+    only check a flag, so the instrumentation can stay in the game loop"""
+
+    def __init__(self, window, refresh_frames):
+        """Init an empty (and disabled) profiler"""
+        self.enabled = False
+        # Number of samples kept per stage, and how often the overlay text is re-rendered
+        self.window = window
+        self.refresh_frames = refresh_frames
+
+        self.stage_starts = {}
+        self.stage_times = {}
+        self.counts = collections.OrderedDict()
+
+        self.overlay = None
+        self.frames_since_refresh = 0
+
+        # Overlay colors
+        self.background_color = (0, 0, 0)
+        self.text_color = (220, 220, 220)
+        self.over_budget_color = (255, 80, 80)
+
+    def toggle(self):
+        """Turn the profiler and its overlay on or off, starting over with no samples"""
+        self.enabled = not self.enabled
+        self.stage_starts.clear()
+        self.stage_times.clear()
+        self.counts.clear()
+        self.overlay = None
+
+    def begin(self, stage):
+        """Mark the start of a stage"""
+        if self.enabled:
+            self.stage_starts[stage] = time.perf_counter()
+
+    def end(self, stage):
+        """Mark the end of a stage and record how long it took"""
+        if self.enabled:
+            # The profiler may have been switched on part way through the stage
+            start_time = self.stage_starts.pop(stage, None)
+            if start_time is None:
+                return
+            samples = self.stage_times.get(stage)
+            if samples is None:
+                samples = collections.deque(maxlen=self.window)
+                self.stage_times[stage] = samples
+            samples.append((time.perf_counter() - start_time) * 1000)
+
+    def set_count(self, name, count):
+        """Record a live count (e.g. enemies) to show on the overlay"""
+        self.counts[name] = count
+
+    def get_stats(self):
+        """Returns {stage: (average, p95, p99, max)} in milliseconds over the rolling window"""
+        # Sorted by name, so the sub-steps (e.g. 'update.player') follow their stage
+        stats = collections.OrderedDict()
+        for stage, samples in sorted(self.stage_times.items()):
+            ordered = sorted(samples)
+            last_index = len(ordered) - 1
+            stats[stage] = (sum(ordered) / len(ordered), ordered[int(last_index * 0.95)], ordered[int(last_index * 0.99)], ordered[-1])
+        return stats
+
+    def create_overlay(self, font, frame_budget_ms):
+        """Render the stats and counts onto a new surface"""
+        # Each line is a label followed by right aligned columns
+        lines = [(['stage (ms)', 'avg', 'p95', 'p99'], self.text_color)]
+        for stage, (average, p95, p99, maximum) in self.get_stats().items():
+            color = self.over_budget_color if p99 > frame_budget_ms else self.text_color
+            lines.append(([stage] + ['{:.2f}'.format(value) for value in (average, p95, p99)], color))
+        for name, count in self.counts.items():
+            lines.append(([name, str(count)], self.text_color))
+
+        # The font may not be monospaced, so lay the columns out by their rendered widths
+        label_width = max(font.get_rect(fields[0]).width for fields, color in lines) + 8
+        column_width = font.get_rect('000.00').width + 8
+        line_height = font.get_sized_height()
+        overlay = pygame.Surface((label_width + column_width * 3 + 8, line_height * len(lines) + 8))
+        overlay.fill(self.background_color)
+        for line_index, (fields, color) in enumerate(lines):
+            top = 4 + line_index * line_height
+            font.render_to(overlay, (4, top), fields[0], color)
+            for column_index, text in enumerate(fields[1:]):
+                right = 4 + label_width + column_width * (column_index + 1)
+                font.render_to(overlay, (right - font.get_rect(text).width, top), text, color)
+        return overlay
+
+    def get_overlay_rect(self, screen):
+        """Where the overlay goes (top right), an empty rect when there's nothing to show"""
+        if not self.enabled or self.overlay is None:
+            return pygame.Rect(0, 0, 0, 0)
+        overlay_rect = self.overlay.get_rect()
+        overlay_rect.topright = (screen.get_width() - 4, 4)
+        return overlay_rect
+
+    def draw_overlay(self, screen, font, frame_budget_ms):
+        """Draw the overlay, the text is only re-rendered every refresh_frames frames"""
+        if not self.enabled:
+            return
+        self.frames_since_refresh += 1
+        if self.overlay is None or self.frames_since_refresh >= self.refresh_frames:
+            self.overlay = self.create_overlay(font, frame_budget_ms)
+            self.frames_since_refresh = 0
+        screen.blit(self.overlay, self.get_overlay_rect(screen))
@@ -1,21 +1,54 @@
 """This module implements standard game functions for Py-Climber, such as processing keypresses"""
 
 import sys
-import random
-from src.blob_enemy import Blob
 import pygame
 import pygame.freetype
 
 def check_events(settings, screen, tile_map):
     """Watch for keyboard and mouse events"""
+    settings.profiler.begin('events')
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             sys.exit()
 
-        elif event.type == pygame.KEYDOWN:
-            check_keydown_events(settings, event, screen, tile_map)
-        elif event.type == pygame.KEYUP:
-        	check_keyup_events(settings, event, screen, tile_map)
+        elif event.type in (pygame.KEYDOWN, pygame.KEYUP):
+            if is_live_key_event(settings, event):
+                record_key_event(settings, event)
+                handle_key_event(settings, event, screen, tile_map)
+    settings.profiler.end('events')
+
+def handle_key_event(settings, event, screen, tile_map):
+    """Dispatch a key press or release"""
+    if event.type == pygame.KEYDOWN:
+        check_keydown_events(settings, event, screen, tile_map)
+    else:
+        check_keyup_events(settings, event, screen, tile_map)
+
+# Quitting and the debug toggles (F3 profiler overlay, F9 image format) aren't part of the
+# session, so they are never recorded and still work during a replay
+unrecorded_keys = {pygame.K_ESCAPE, pygame.K_F3, pygame.K_F9}
+
+def is_live_key_event(settings, event):
+    """While replaying, the keyboard is ignored (other than the unrecorded keys) and the recorded keys are used instead"""
+    return not settings.replayer or event.key in unrecorded_keys
+
+def record_key_event(settings, event):
+    """Log the key event against the tick it's handled before, if the session is being recorded"""
+    if settings.recorder and event.key not in unrecorded_keys:
+        settings.recorder.record_key(settings.animation_clock.tick, event.type == pygame.KEYDOWN, event.key)
+
+def apply_replay_input(settings, screen, tile_map):
+    """Handle the recorded key events for the tick about to run, if a session is being replayed"""
+    if settings.replayer:
+        for event in settings.replayer.get_key_events(settings.animation_clock.tick):
+            handle_key_event(settings, event, screen, tile_map)
+
+def check_state_checksum(settings, tile_map, tick):
+    """Record the state checksum after a tick, or check it against the replay"""
+    if settings.recorder:
+        settings.recorder.record_checksum(tick, tile_map.get_state_checksum())
+    if settings.replayer:
+        settings.replayer.check_checksum(tick, tile_map.get_state_checksum())
 
 def reset_game(tile_map):
     tile_map.reset()
@@ -44,6 +77,9 @@ def check_keydown_events(settings, event, screen, tile_map):
                 player.dx = settings.player_dx
                 player.facing_left = False
         
+    if event.key == pygame.K_F3:
+        settings.profiler.toggle()
+
     if event.key == pygame.K_F9:
         if settings.fullscreen == True:
             settings.fullscreen = False
@@ -52,6 +88,14 @@ def check_keydown_events(settings, event, screen, tile_map):
             settings.fullscreen = True
             pygame.display.set_mode((800, 600), pygame.FULLSCREEN)
 
+        # The display format may have changed with the mode, keep the images in sync with it
+        if settings.image_res.convert_to_display_format():
+            tile_map.refresh_images()
+
+        # The display contents are gone after a mode change, so redraw everything
+        if settings.renderer:
+            settings.renderer.invalidate()
+
 def check_keyup_events(settings, event, screen, tile_map):
     player = tile_map.player
     if event.key == pygame.K_SPACE:
@@ -77,13 +121,17 @@ def generate_new_random_blob(settings, screen, images, tile_map):
     """Generate a new blob enemy and add it to the list"""
     # How this should work:  First pick a floor, this is the middle_row of the triad created
     # when generating the map, e.g. not the floor and not a level where blocks can appear
-    floor_number = random.randint(0, settings.map_number_floors - 2)
+    floor_number = settings.rng.enemies.randint(0, settings.map_number_floors - 2)
 
     # Secondly pick a side, left or right (this will affect placement and initial velocity, etc)
-    facing_left = random.choice([True, False])
+    facing_left = settings.rng.enemies.choice([True, False])
+
+    # Recycle a blob from the pool, a full pool means we're at the population cap
+    enemy = tile_map.blob_pool.acquire(len(tile_map.enemies))
+    if enemy is None:
+        return
 
     # Calculate initial position / velocity / facing flags
-    enemy = Blob(settings, screen, images)
     enemy.rect.bottom = settings.tile_height * ( 2 + (3 * floor_number))
     enemy.rect.left = 3 * settings.tile_width + tile_map.x_offset
     enemy.dx = settings.enemy_blob_dx
@@ -99,46 +147,101 @@ def generate_new_random_blob(settings, screen, images, tile_map):
 
     # Add it to the list
     tile_map.enemies.add(enemy)
+
+    # The vectorized engine copies the blob's state, so the object can go straight back
+    if tile_map.blob_engine is not None:
+        tile_map.blob_pool.release(enemy)
     
+def get_help_text_lines(screen):
+    """Returns the help text as a list of ((x, y), text) entries, bottom line first"""
+    y = screen.get_rect().bottom - 48
+    return [
+        ((10, y), "ESC to exit"),
+        ((10, y - 20), "F3 to toggle the profiler"),
+        ((10, y - 40), "F9 to toggle fullscreen"),
+        ((10, y - 60), "'a' to add a new enemy"),
+        ((10, y - 80), "'r' to reset"),
+        ((15, y - 100), "...can jump once in air"),
+        ((10, y - 120), "SPACE to jump"),
+        ((10, y - 140), "LEFT/RIGHT arrows to walk"),
+    ]
+
+def get_help_text_rect(settings, screen):
+    """Returns the rect bounding all of the help text lines"""
+    help_rect = None
+    for position, text in get_help_text_lines(screen):
+        text_rect = settings.font.get_rect(text)
+        text_rect.topleft = position
+        if help_rect:
+            help_rect.union_ip(text_rect)
+        else:
+            help_rect = text_rect
+    return help_rect
+
+def create_help_text_surface(settings, screen):
+    """Composite all of the help text lines onto one transparent surface"""
+    help_rect = get_help_text_rect(settings, screen)
+    surface = pygame.Surface(help_rect.size, pygame.SRCALPHA)
+    surface.fill((0, 0, 0, 0))
+    for position, text in get_help_text_lines(screen):
+        line = settings.text_cache.render(settings.font, text, settings.font_color)
+        surface.blit(line, (position[0] - help_rect.left, position[1] - help_rect.top))
+    return surface, help_rect
+
+def get_help_text_surface(settings, screen):
+    """Returns the composited help text and where it goes, this is only rendered once per screen size"""
+    key = ('HELP', settings.font, settings.font_color, screen.get_size())
+    return settings.text_cache.get(key, lambda: create_help_text_surface(settings, screen))
+
 def blit_help_text(settings, screen):
     """Draws the text explaining what keys do what"""
-    color_white = (255, 255, 255)
-    y = screen.get_rect().bottom - 48
-    font = settings.font
-    font.render_to(screen, (10,y), "ESC to exit", settings.font_color)
-    y -= 20
-    font.render_to(screen, (10,y), "F9 to toggle fullscreen", settings.font_color)
-    y -= 20
-    font.render_to(screen, (10,y), "'a' to add a new enemy", settings.font_color)
-    y -= 20
-    font.render_to(screen, (10,y), "'r' to reset", settings.font_color)
-    y -= 20
-    font.render_to(screen, (15,y), "...can jump once in air", settings.font_color)
-    y -= 20
-    font.render_to(screen, (10,y), "SPACE to jump", settings.font_color)
-    y -= 20
-    font.render_to(screen, (10,y), "LEFT/RIGHT arrows to walk", settings.font_color)
+    surface, help_rect = get_help_text_surface(settings, screen)
+    screen.blit(surface, help_rect)
     
 def update_game_objects(settings, tile_map):
+    settings.profiler.begin('update')
     tile_map.update()
+    settings.profiler.end('update')
 
 def draw_game_objects(settings, screen, tile_map):
+    settings.profiler.begin('draw')
     # Draw the map - pass True to render a grid overlay on the tiles
     tile_map.draw()
 
     # Draw help text
     blit_help_text(settings, screen)
+    settings.profiler.end('draw')
+
+def draw_profiler_overlay(settings, screen):
+    """Draws the frame profiler's stats, only when it's switched on"""
+    settings.profiler.draw_overlay(screen, settings.profiler_font, 1000 / settings.render_fps)
 
 def update_screen(settings, screen, tile_map):
     """Update images and flip screen"""
-    # Redraw screen each pass
-    screen.fill(settings.bg_color)
-
     # UPDATES...
     update_game_objects(settings, tile_map)
 
+    # DRAWS...
+    draw_screen(settings, screen, tile_map)
+
+def draw_screen(settings, screen, tile_map):
+    """Draw the current state and flip screen, the game loop can run several updates between draws"""
+    # The dirty rect renderer restores and pushes only the regions that changed
+    # (it pushes the changes itself, so there's no separate flip stage)
+    if settings.renderer:
+        settings.profiler.begin('draw')
+        settings.renderer.draw()
+        settings.profiler.end('draw')
+        return
+
+    # Redraw screen each pass
+    screen.fill(settings.bg_color)
+
     # DRAWS...
     draw_game_objects(settings, screen, tile_map)
+    draw_profiler_overlay(settings, screen)
 
     # FLIP....
+    settings.profiler.begin('flip')
     pygame.display.flip()
+    settings.profiler.end('flip')
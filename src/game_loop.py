@@ -0,0 +1,77 @@
+"""This module implements the fixed-step game loop for Py-Climber"""
+
+import src.game_functions as gf
+import pygame
+
+class GameLoop():
+    """Decouples simulation ticks from rendered frames.  Real time is gathered in an accumulator
+    (scaled by the speed multiplier) and spent in whole ticks of settings.simulation_tick_ms, so
+    several ticks can run per render, or none.  The physics is per tick, so the state after any
+    given number of ticks is the same whatever the speed or render rate was"""
+
+    def __init__(self, settings, screen, tile_map):
+        """Init the loop, no time has been accumulated yet"""
+        self.settings = settings
+        self.screen = screen
+        self.tile_map = tile_map
+        self.clock = pygame.time.Clock()
+        self.accumulator_ms = 0.0
+        self.ticks = 0
+        self.frames = 0
+
+    def is_unbounded(self):
+        """True if the simulation should run as fast as possible"""
+        return self.settings.simulation_speed <= 0
+
+    def get_ticks_due(self, elapsed_ms):
+        """Add the elapsed real time to the accumulator and take out the whole ticks it now holds"""
+        settings = self.settings
+        if self.is_unbounded():
+            return settings.simulation_max_ticks_per_render
+
+        self.accumulator_ms += elapsed_ms * settings.simulation_speed
+        ticks_due = int(self.accumulator_ms // settings.simulation_tick_ms)
+        if ticks_due > settings.simulation_max_ticks_per_render:
+            # Too far behind to catch up, drop the extra time rather than stalling the renders
+            ticks_due = settings.simulation_max_ticks_per_render
+            self.accumulator_ms = 0.0
+        else:
+            self.accumulator_ms -= ticks_due * settings.simulation_tick_ms
+        return ticks_due
+
+    def step(self):
+        """Advance the simulation by exactly one tick"""
+        # Replayed input goes in before the tick it was recorded against, and the state after the
+        # tick is checksummed to catch replays that diverge
+        tick = self.settings.animation_clock.tick
+        gf.apply_replay_input(self.settings, self.screen, self.tile_map)
+        gf.update_game_objects(self.settings, self.tile_map)
+        gf.check_state_checksum(self.settings, self.tile_map, tick)
+        self.ticks += 1
+
+    def render(self):
+        """Draw the current state, unless rendering is turned off"""
+        if self.settings.render_enabled:
+            gf.draw_screen(self.settings, self.screen, self.tile_map)
+            self.frames += 1
+
+    def run_frame(self):
+        """Wait for the next frame, process events, run the ticks that are due and render"""
+        # Only cap the frame rate when running against the clock
+        if self.is_unbounded():
+            elapsed_ms = self.clock.tick()
+        else:
+            elapsed_ms = self.clock.tick(self.settings.render_fps)
+
+        # The whole frame is timed too, to compare against the frame budget
+        profiler = self.settings.profiler
+        profiler.begin('frame')
+
+        # Process system events (key-presses, joystick, etc)
+        gf.check_events(self.settings, self.screen, self.tile_map)
+
+        for tick in range(0, self.get_ticks_due(elapsed_ms)):
+            self.step()
+
+        self.render()
+        profiler.end('frame')
@@ -1,62 +1,178 @@
 """This module caches images for the Py-Climber game"""
 
+import os
 import pygame
+import zlib
+from src.asset_pack import AssetPack
 
 class ImageResources():
     """Hold all of the loaded image data to be shared"""
 
+    # The sheets sliced into frames: attribute, file and the settings with the frame width and height
+    sheet_files = (
+        ('tile_images', 'images/tiles.bmp', 'tile_width', 'tile_height'),
+        ('player_sprite_images', 'images/sprite_player.bmp', 'player_width', 'player_height'),
+        ('enemy_blob_images', 'images/sprite_blob.bmp', 'enemy_blob_width', 'enemy_blob_height'),
+        ('blob_exit_images', 'images/sprite_exit.bmp', 'tile_width', 'tile_height'),
+        ('digit_images', 'images/digits.bmp', 'digit_width', 'digit_height'),
+        ('lcd_digit_images', 'images/timer_digits.bmp', 'lcd_digit_width', 'lcd_digit_height'),
+    )
+
+    # The single images: attribute, file and whether it has the color key
+    image_files = (
+        ('block_image', 'images/block.bmp', True),
+        ('lcd_frame_image', 'images/timer_frame.bmp', False),
+        ('level_image', 'images/level_text.bmp', True),
+    )
+
     def __init__(self, settings):
         """Load and store the images we need"""
 
         self.settings = settings
-        # Load the tile frames
-        self.tile_images = []
-        tile_images = self.tile_images
-        self.load_image_to_tiles('images/tiles.bmp', self.settings.tile_width, self.settings.tile_height, tile_images)
-
-        # Load the sprite frames
-        self.player_sprite_images = []
-        player_images = self.player_sprite_images
-        self.load_image_to_tiles('images/sprite_player.bmp', self.settings.player_width, self.settings.player_height, player_images)
-
-        # Load the enemy blob frames
-        self.enemy_blob_images = []
-        blob_images = self.enemy_blob_images
-        self.load_image_to_tiles('images/sprite_blob.bmp', self.settings.enemy_blob_width, self.settings.enemy_blob_height, blob_images)
-
-        # Load the platform block image
-        self.block_image = pygame.image.load('images/block.bmp')
-        self.block_image.set_colorkey(self.settings.color_key)
-
-        # Load the exit sprite (blade)
-        self.blob_exit_images = []
-        exit_images = self.blob_exit_images
-        self.load_image_to_tiles('images/sprite_exit.bmp', self.settings.tile_width, self.settings.tile_height, exit_images)
-
-        # Load digits
-        self.digit_images = []
-        digit_images = self.digit_images
-        self.load_image_to_tiles('images/digits.bmp', self.settings.digit_width, self.settings.digit_height, digit_images)
-
-        # Load 'LCD' digits
-        self.lcd_digit_images = []
-        lcd_digit_images = self.lcd_digit_images
-        self.load_image_to_tiles('images/timer_digits.bmp', self.settings.lcd_digit_width, self.settings.lcd_digit_height, lcd_digit_images)
-
-        # Load timer frames - no need for a color key on this one
-        self.lcd_frame_image = pygame.image.load('images/timer_frame.bmp')
-
-        # Load 'LEVEL' text
-        self.level_image = pygame.image.load('images/level_text.bmp')
-        self.level_image.set_colorkey(self.settings.color_key)
-        
+        # Pixel format the images were last converted to, see convert_to_display_format()
+        self.display_format = None
+        # In atlas mode each sheet is kept once as [sheet, tile_width, tile_height, images]
+        # and the frames in images are subsurface views into it
+        self.sheets = []
+
+        # Use the baked asset pack if it's still in step with the bitmaps, see asset_pack.py
+        self.asset_pack = None
+        if settings.asset_pack_path and os.path.exists(settings.asset_pack_path):
+            asset_pack = AssetPack(settings.asset_pack_path)
+            if asset_pack.fingerprint == self.get_fingerprint(settings):
+                self.asset_pack = asset_pack
+            else:
+                asset_pack.close()
+
+        # Load the tile, player, blob, exit, digit and 'LCD' digit frames
+        for name, file_name, width_setting, height_setting in self.sheet_files:
+            images = []
+            setattr(self, name, images)
+            tile_width = getattr(self.settings, width_setting)
+            tile_height = getattr(self.settings, height_setting)
+            if self.asset_pack:
+                self.load_packed_tiles(name, tile_width, tile_height, images)
+            else:
+                self.load_image_to_tiles(file_name, tile_width, tile_height, images)
+
+        # Load the platform block image, the timer frame (no need for a color key on this one)
+        # and the 'LEVEL' text
+        for name, file_name, colorkey in self.image_files:
+            if self.asset_pack:
+                image = self.asset_pack.get_images(name)[0]
+            else:
+                image = pygame.image.load(file_name)
+                if colorkey:
+                    image.set_colorkey(self.settings.color_key)
+            setattr(self, name, image)
+
+    @staticmethod
+    def get_fingerprint(settings):
+        """A CRC of the settings the bitmaps are sliced and keyed with, and of each bitmap's size
+        and modification time, if it changes an asset pack baked from them is stale.  Reading the
+        bitmaps to check them would cost about as much as loading them"""
+        sources = [settings.color_key]
+        for name, file_name, width_setting, height_setting in ImageResources.sheet_files:
+            file_stat = os.stat(file_name)
+            sources.append((name, getattr(settings, width_setting), getattr(settings, height_setting),
+                file_stat.st_size, file_stat.st_mtime_ns))
+        for name, file_name, colorkey in ImageResources.image_files:
+            file_stat = os.stat(file_name)
+            sources.append((name, colorkey, file_stat.st_size, file_stat.st_mtime_ns))
+        return zlib.crc32(repr(sources).encode('ascii'))
+
+    def write_asset_pack(self, path):
+        """Bake the images, as loaded and sliced (before converting them to the display format),
+        into an asset pack"""
+        entries = [(name, getattr(self, name)) for name, file_name, width_setting, height_setting in self.sheet_files]
+        entries.extend((name, [getattr(self, name)]) for name, file_name, colorkey in self.image_files)
+        AssetPack.write(path, self.get_fingerprint(self.settings), entries)
+
+    def convert_image(self, image):
+        """Convert a single image to the display format, keeping its colorkey (with RLE acceleration).
+        Images without a colorkey (the timer frame) are kept as they are, they blit faster as loaded
+        than converted (see benchmarks/bench_image_format.py)"""
+        colorkey = image.get_colorkey()
+        if not colorkey:
+            return image
+        image = image.convert()
+        image.set_colorkey(colorkey, pygame.RLEACCEL)
+        return image
+
+    def convert_to_display_format(self):
+        """Convert every image to the pixel format of the active display, so blits don't have to
+        convert each pixel on the fly.  This requires pygame.display.set_mode() to have been called
+        and does nothing if the images already match the display.  Returns True if the images were converted"""
+        display = pygame.display.get_surface()
+        if display is None:
+            return False
+
+        display_format = (display.get_bitsize(), display.get_masks())
+        if display_format == self.display_format:
+            return False
+        self.display_format = display_format
+
+        # The lists are shared with the sprites, so update them in place
+        if self.settings.image_atlas:
+            # Convert the sheet once and re-slice it, converting the views would copy them.
+            # RLE isn't used here since it would keep an encoded copy of every frame
+            for sheet_entry in self.sheets:
+                sheet, tile_width, tile_height, images = sheet_entry
+                colorkey = sheet.get_colorkey()
+                sheet = sheet.convert()
+                sheet.set_colorkey(colorkey)
+                sheet_entry[0] = sheet
+                images[:] = self.slice_sheet(sheet, tile_width, tile_height)
+        else:
+            image_lists = [self.tile_images, self.player_sprite_images, self.enemy_blob_images, 
+                self.blob_exit_images, self.digit_images, self.lcd_digit_images]
+            for images in image_lists:
+                images[:] = [self.convert_image(image) for image in images]
+
+        # Single images are referenced directly, see Tilemap.refresh_images()
+        self.block_image = self.convert_image(self.block_image)
+        self.lcd_frame_image = self.convert_image(self.lcd_frame_image)
+        self.level_image = self.convert_image(self.level_image)
+        return True
+
+    def slice_sheet(self, sheet, tile_width, tile_height):
+        """Returns a list of subsurface views into the sheet, one per tile, without copying any pixels"""
+        sheet_rect = sheet.get_rect()
+
+        # Calculate the number of tiles in one row/col of the image (ignoring any remaining space)
+        tiles_per_row = sheet_rect.width // tile_width
+        tiles_per_col = sheet_rect.height // tile_height
+
+        images = []
+        for row_index in range(0, tiles_per_col):
+            for col_index in range(0, tiles_per_row):
+                # Views inherit the sheet's colorkey
+                images.append(sheet.subsurface((col_index * tile_width, row_index * tile_height, tile_width, tile_height)))
+        return images
+
+    def load_packed_tiles(self, name, tile_width, tile_height, images):
+        """Add the frames baked into the asset pack under the name, nothing is decoded or sliced"""
+        # Atlas mode keeps the frames stacked in one sheet and hands out views into it
+        if self.settings.image_atlas:
+            sheet = self.asset_pack.get_sheet(name)
+            self.sheets.append([sheet, tile_width, tile_height, images])
+            images.extend(self.slice_sheet(sheet, tile_width, tile_height))
+        else:
+            images.extend(self.asset_pack.get_images(name))
 
     def load_image_to_tiles(self, file_name, tile_width, tile_height, images):
         """Load the specified image and attempt to split it into tiles
         of the specified width and height."""
         image = pygame.image.load(file_name)
-        image_rect = image.get_rect()
 
+        # Atlas mode keeps the sheet once and hands out views into it
+        if self.settings.image_atlas:
+            image.set_colorkey(self.settings.color_key)
+            self.sheets.append([image, tile_width, tile_height, images])
+            images.extend(self.slice_sheet(image, tile_width, tile_height))
+            return
+
+        image_rect = image.get_rect()
         image_width = image_rect.width
         image_height = image_rect.height
 
@@ -0,0 +1,46 @@
+"""This module implements the step-at-a-time level builder for Py-Climber"""
+
+from pygame.sprite import Group
+
+class LevelBuilder():
+    """Builds the platforms of a level (the blocks, their grid and the pre-rendered block layer) a
+    step at a time, so the work can be spread over the frames while the player waits at the top
+    and the level change only has to swap the finished pieces in (see Tilemap.install_platforms).
+    The map stream is drawn from in the same order either way, so the level is the same.  Given a
+    saved level (see level_data.py) its blocks are built instead, without touching the map stream"""
+
+    def __init__(self, tile_map, level=None):
+        """Init an empty level, nothing is built until step() or finish()"""
+        self.tile_map = tile_map
+        self.level = level
+        # The stream the rows are drawn from, reseeding replaces it (see Tilemap.generate_platforms)
+        self.rng = tile_map.settings.rng.map
+        self.block_group = Group()
+        self.block_grid = None
+        self.block_layer = None
+        self.block_layer_rect = None
+        self.steps = self.generate_steps()
+        self.done = False
+
+    def generate_steps(self):
+        """One row of platforms per step, then the grid, then the layer"""
+        if self.level is None:
+            rows = self.tile_map.generate_platform_rows(self.block_group, self.rng)
+        else:
+            rows = self.tile_map.generate_level_rows(self.block_group, self.level)
+        for row in rows:
+            yield
+        self.block_grid = self.tile_map.create_block_grid(self.block_group)
+        yield
+        self.block_layer, self.block_layer_rect = self.tile_map.create_block_layer(self.block_group)
+
+    def step(self):
+        """Do the next piece of the work, returns True once the level is built"""
+        if not self.done:
+            self.done = next(self.steps, StopIteration) is StopIteration
+        return self.done
+
+    def finish(self):
+        """Do whatever work is left"""
+        while not self.step():
+            pass
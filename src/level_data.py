@@ -0,0 +1,107 @@
+"""This module implements the compact saved form of a Py-Climber level"""
+
+import struct
+import zlib
+
+# Record layout: a header (magic, version, seed, settings fingerprint, number of tile indices,
+# floors and columns of the block field) followed by the tile indices (one signed byte each, -1
+# is an empty tile) and the block field, 4 bits per playable column per floor packed two to a
+# byte.  The size only depends on the map settings, so every level saved with the same settings
+# takes the same number of bytes (see level_pack.py)
+level_magic = b'PYCL'
+level_version = 1
+level_header = struct.Struct('<4sHQIHBB')
+
+class LevelData():
+    """A level's tile index grid and block platforms, as saved to and loaded from bytes.  Each
+    playable column of each floor is a cell of 4 blocks, one bit per block (see cell_quadrants),
+    and the top two are always set by generate_platforms.  Loading a level (see Tilemap.load_level)
+    rebuilds the same blocks without drawing from the map stream.  The seed is the session seed
+    the level was generated from, and the fingerprint covers the settings the layout depends on,
+    a level only loads into a map with the same fingerprint"""
+
+    # Offset of the block for each bit of a cell, in blocks: top left, top right, bottom left, bottom right
+    cell_quadrants = ((0, 0), (1, 0), (0, 1), (1, 1))
+
+    @staticmethod
+    def get_fingerprint(settings):
+        """A CRC of the settings the tile indices and block positions depend on"""
+        layout = (settings.screen_width, settings.screen_height, settings.tile_width, settings.tile_height,
+            settings.map_width, settings.map_playable_width, settings.map_number_floors, settings.map_number_subfloors)
+        return zlib.crc32(repr(layout).encode('ascii'))
+
+    @staticmethod
+    def get_record_size(index_count, floors, columns):
+        """Bytes taken by a saved level of the given dimensions"""
+        return level_header.size + index_count + (floors * columns + 1) // 2
+
+    @staticmethod
+    def from_tile_map(tile_map):
+        """Capture the map's current tile indices and blocks, with the session seed"""
+        settings = tile_map.settings
+        floors = settings.map_number_floors - 1
+        columns = settings.map_playable_width
+        cells = bytearray(floors * columns)
+
+        # Cells start a block's width and height apart, on every 3rd tile row from the 2nd to top
+        # (see Tilemap.generate_platform_rows)
+        bounds = tile_map.player_bounds_rect
+        block_rect = tile_map.block_image.get_rect()
+        floor_height = settings.tile_height * 3
+        for block in tile_map.block_group:
+            x = block.rect.left - bounds.left
+            y = block.rect.top - (bounds.top + settings.tile_height * 2)
+            col, quadrant_x = divmod(x, settings.tile_width)
+            row, quadrant_y = divmod(y, floor_height)
+            bit = LevelData.cell_quadrants.index((quadrant_x // block_rect.width, quadrant_y // block_rect.height))
+            cells[row * columns + col] |= 1 << bit
+
+        return LevelData(settings.rng.seed_value, LevelData.get_fingerprint(settings), tile_map.indicies, floors, columns, cells)
+
+    @staticmethod
+    def unpack_from(buffer, offset=0):
+        """Read a level from the buffer (bytes, or e.g. an mmap of a level pack) at the offset"""
+        if len(buffer) - offset < level_header.size:
+            raise ValueError('Not a Py-Climber level, it is too short')
+        magic, version, seed, fingerprint, index_count, floors, columns = level_header.unpack_from(buffer, offset)
+        if magic != level_magic or version != level_version:
+            raise ValueError('Not a version {} Py-Climber level'.format(level_version))
+        if len(buffer) - offset < LevelData.get_record_size(index_count, floors, columns):
+            raise ValueError('The Py-Climber level is truncated')
+
+        offset += level_header.size
+        indices = struct.unpack_from('<{}b'.format(index_count), buffer, offset)
+        offset += index_count
+
+        # Low nibble first
+        cells = bytearray(floors * columns)
+        packed = buffer[offset:offset + (len(cells) + 1) // 2]
+        for index, value in enumerate(packed):
+            cells[index * 2] = value & 0x0F
+            if index * 2 + 1 < len(cells):
+                cells[index * 2 + 1] = value >> 4
+        return LevelData(seed, fingerprint, indices, floors, columns, cells)
+
+    def __init__(self, seed, fingerprint, indices, floors, columns, cells):
+        """Init the level from its unpacked parts, cells holds floors * columns block bit masks row by row"""
+        self.seed = seed
+        self.fingerprint = fingerprint
+        self.indices = list(indices)
+        self.floors = floors
+        self.columns = columns
+        self.cells = bytes(cells)
+
+    def get_cell(self, row, col):
+        """The block bits of the cell (see cell_quadrants)"""
+        return self.cells[row * self.columns + col]
+
+    def pack(self):
+        """The level as bytes"""
+        if self.seed < 0 or self.seed >= 2 ** 64:
+            raise ValueError('Saved levels need a seed in the range 0 to 2^64-1')
+        packed = bytearray((len(self.cells) + 1) // 2)
+        for index, value in enumerate(self.cells):
+            packed[index // 2] |= value << (4 * (index % 2))
+        header = level_header.pack(level_magic, level_version, self.seed, self.fingerprint, len(self.indices),
+            self.floors, self.columns)
+        return header + struct.pack('<{}b'.format(len(self.indices)), *self.indices) + bytes(packed)
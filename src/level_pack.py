@@ -0,0 +1,65 @@
+"""This module implements the memory-mapped level pack for Py-Climber"""
+
+import mmap
+import struct
+from src.level_data import LevelData
+
+# File layout: a header (magic, version, settings fingerprint, record size, number of levels)
+# followed by the levels packed back to back (see level_data.py).  Every level in a pack was saved
+# with the same settings, so they are all record size bytes and level i is at a fixed offset
+level_pack_magic = b'PYLP'
+level_pack_version = 1
+level_pack_header = struct.Struct('<4sHIII')
+
+class LevelPack():
+    """A file of saved levels, e.g. a benchmark or tournament set, loaded by index.  The file is
+    memory-mapped rather than read, so opening a pack of thousands of levels costs nothing up front,
+    get_level(i) only touches level i's bytes, and processes opening the same pack share its pages"""
+
+    @staticmethod
+    def write(path, levels):
+        """Save the levels (LevelData) to a new pack file, they must share a settings fingerprint"""
+        records = [level.pack() for level in levels]
+        if not records:
+            raise ValueError('A level pack needs at least one level')
+        fingerprint = levels[0].fingerprint
+        if any(level.fingerprint != fingerprint for level in levels):
+            raise ValueError('The levels in a pack must be saved with the same map settings')
+
+        with open(path, 'wb') as pack_file:
+            pack_file.write(level_pack_header.pack(level_pack_magic, level_pack_version, fingerprint,
+                len(records[0]), len(records)))
+            for record in records:
+                pack_file.write(record)
+
+    def __init__(self, path):
+        """Map the pack file and check its header, no level is read until asked for"""
+        with open(path, 'rb') as pack_file:
+            # Mapping a file keeps it open, the handle can go
+            self.data = mmap.mmap(pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.data) < level_pack_header.size:
+            self.close()
+            raise ValueError('{} is not a Py-Climber level pack'.format(path))
+        magic, version, self.fingerprint, self.record_size, self.count = level_pack_header.unpack_from(self.data, 0)
+        if magic != level_pack_magic or version != level_pack_version:
+            self.close()
+            raise ValueError('{} is not a version {} Py-Climber level pack'.format(path, level_pack_version))
+        if len(self.data) < level_pack_header.size + self.record_size * self.count:
+            self.close()
+            raise ValueError('{} is truncated'.format(path))
+
+    def __len__(self):
+        """Number of levels in the pack"""
+        return self.count
+
+    def get_level(self, index):
+        """Load level index (0 based) from the pack"""
+        if index < 0 or index >= self.count:
+            raise IndexError('level {} is not in the pack of {}'.format(index, self.count))
+        return LevelData.unpack_from(self.data, level_pack_header.size + index * self.record_size)
+
+    def close(self):
+        """Unmap the file, no more levels can be loaded"""
+        if not self.data.closed:
+            self.data.close()
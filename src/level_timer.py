@@ -1,98 +1,107 @@
 """This module implements the timer for a level.  The time used to complete will be factored into the final scoring logic"""
 
-from src.digit_sprite import DigitSprite
-from pygame.sprite import Group
 import pygame
 
 class LevelTimer():
-    """The LevelTimer class represents a digital LCD style timer composed of a frame image and several DigitSprites"""
+    """The LevelTimer class represents a digital LCD style timer composed of a frame image and 3 pairs of digits.
+    The frame and digits are composited onto one surface which is only touched when the displayed time changes"""
 
     def __init__(self, settings, screen):
         """Initialize the level timer state"""
         self.settings = settings
         self.screen = screen
         self.screen_rect = self.screen.get_rect()
-        self.clock = pygame.time.Clock()
-        self.frame_image = self.settings.image_res.lcd_frame_image
-        self.rect = self.frame_image.get_rect()
-        self.digits = Group()
+        self.rect = self.settings.image_res.lcd_frame_image.get_rect()
         self.running = True
         self.elapsed_time_ms = 0
-        self.last_rect = self.rect
-        
-        # Create the digits MM:SS:hh
-        self.digit_M1 = self.create_and_add_digit(self.digits)
-        self.digit_M2 = self.create_and_add_digit(self.digits)
-        self.digit_S1 = self.create_and_add_digit(self.digits)
-        self.digit_S2 = self.create_and_add_digit(self.digits)
-        self.digit_h1 = self.create_and_add_digit(self.digits)
-        self.digit_h2 = self.create_and_add_digit(self.digits)
 
-        # Each digit is positioned relative to the frame
-        self.position_digits()
+        # Pre-rendered 00-99 pairs, and where each MM:SS:hh pair sits relative to the frame
+        self.frame_image = None
+        self.pair_images = []
+        self.pair_rects = []
+        self.position_pairs()
+
+        # The frame with the current time drawn on it, and the (MM, SS, hh) it shows
+        self.image = None
+        self.displayed_time = None
+        self.refresh_images()
 
     def reset(self):
         """Resets the counter to 0"""
         self.elapsed_time_ms = 0
-        self.clock = pygame.time.Clock()
         self.running = True
         
     def stop(self):
         """Stop the timer"""
         self.running = False
 
-    def create_and_add_digit(self, digit_group):
-        """Make a new digit and add it to the group"""
-        digit_object = DigitSprite(self.settings, self.screen, self.settings.image_res.lcd_digit_images, 0)
-        digit_group.add(digit_object)
-        return digit_object
+    def refresh_images(self):
+        """(Re)build the pair images and the composited timer from the shared image resources"""
+        image_res = self.settings.image_res
+        self.frame_image = image_res.lcd_frame_image
+        self.pair_images = []
+        for pair in range(0, 100):
+            self.pair_images.append(self.create_pair_image(image_res.lcd_digit_images, pair // 10, pair % 10))
+
+        self.image = self.frame_image.copy()
+        self.displayed_time = None
+        self.set_time(0, 0, 0)
+
+    def create_pair_image(self, digit_images, digit_left, digit_right):
+        """Render two digits side by side, spaced the same way as they are on the frame"""
+        digit_width = self.settings.lcd_digit_width
+        pair_width = digit_width * 2 + self.settings.lcd_frame_digit_padding_horz_minor
+        pair_image = pygame.Surface((pair_width, self.settings.lcd_digit_height))
+        pair_image.fill(self.settings.color_key)
+        pair_image.set_colorkey(self.settings.color_key, pygame.RLEACCEL)
+        pair_image.blit(digit_images[digit_left], (0, 0))
+        pair_image.blit(digit_images[digit_right], (digit_width + self.settings.lcd_frame_digit_padding_horz_minor, 0))
+        return pair_image
 
     def position_frame(self, top, left):
         """Move the base frame to a given location"""
+        # The digits are positioned relative to the frame, so nothing else has to move
         self.rect.top = top
         self.rect.left = left
-        self.position_digits()
-
-    def position_digit_pair(self, digit_left, digit_right, x_offset, y_offset):
-        """Position a pair of digits, e.g. MM or SS relative to a given offset from the frame"""
-        digit_width = digit_left.rect.width
-        # Left
-        digit_left.set_start_position(y_offset, x_offset, 0, 0, 0)
-        x_offset += self.settings.lcd_frame_digit_padding_horz_minor + digit_width
-        # Right
-        digit_right.set_start_position(y_offset, x_offset, 0, 0, 0)
-        x_offset += self.settings.lcd_frame_digit_padding_horz_major + digit_width
-
-    def position_digits(self):
-        """Move each digit sprite based on the frame position"""
-        y_offset = self.rect.top + self.settings.lcd_frame_padding_vert
-        x_offset = self.rect.left + self.settings.lcd_frame_padding_horz
-
-        self.position_digit_pair(self.digit_M1, self.digit_M2, x_offset, y_offset)
-        x_offset = self.digit_M2.rect.right + self.settings.lcd_frame_digit_padding_horz_major
-
-        self.position_digit_pair(self.digit_S1, self.digit_S2, x_offset, y_offset)
-        x_offset = self.digit_S2.rect.right + self.settings.lcd_frame_digit_padding_horz_major
-
-        self.position_digit_pair(self.digit_h1, self.digit_h2, x_offset, y_offset)
-        
-    def set_digit_places(self, time, digit_left, digit_right):
-        """Separate the tens and ones digit from each time pair"""
-        digit = int(time / 10)
-        digit_left.set_digit(digit)
-        digit = int(time % 10)
-        digit_right.set_digit(digit)
+
+    def position_pairs(self):
+        """Work out the rect of each digit pair (MM, SS, hh) relative to the frame"""
+        pair_width = self.settings.lcd_digit_width * 2 + self.settings.lcd_frame_digit_padding_horz_minor
+        y_offset = self.settings.lcd_frame_padding_vert
+        x_offset = self.settings.lcd_frame_padding_horz
+
+        self.pair_rects = []
+        for pair_index in range(0, 3):
+            self.pair_rects.append(pygame.Rect(x_offset, y_offset, pair_width, self.settings.lcd_digit_height))
+            x_offset += pair_width + self.settings.lcd_frame_digit_padding_horz_major
+
+    def set_pair(self, pair_index, time):
+        """Redraw one pair of digits on the composited image, e.g. MM or SS"""
+        if time > 99 or time < 0:
+            raise ValueError('Time pairs should always be 0-99, this is an internal bug')
+
+        # Restore the frame under the old digits first, the pairs are colorkeyed
+        pair_rect = self.pair_rects[pair_index]
+        self.image.blit(self.frame_image, pair_rect, pair_rect)
+        self.image.blit(self.pair_images[time], pair_rect)
         
     def set_time(self, minutes, seconds, hundredths_of_seconds):
-        """Set the correct digits"""
-        self.set_digit_places(minutes, self.digit_M1, self.digit_M2)
-        self.set_digit_places(seconds, self.digit_S1, self.digit_S2)
-        self.set_digit_places(hundredths_of_seconds, self.digit_h1, self.digit_h2)
+        """Set the correct digits, only the pairs that changed are redrawn"""
+        new_time = (minutes, seconds, hundredths_of_seconds)
+        if new_time == self.displayed_time:
+            return
+
+        for pair_index in range(0, 3):
+            if self.displayed_time is None or new_time[pair_index] != self.displayed_time[pair_index]:
+                self.set_pair(pair_index, new_time[pair_index])
+        self.displayed_time = new_time
 
     def update(self):
         """Update the clock"""
+        # Count game time rather than wall time, so the timer agrees with the simulation
+        # whatever speed the game loop runs it at
         if self.running:
-            self.elapsed_time_ms += self.clock.tick()
+            self.elapsed_time_ms += self.settings.simulation_tick_ms
 
         # copy the time and define some "constants"
         total_ms = self.elapsed_time_ms
@@ -111,15 +120,14 @@ class LevelTimer():
         # hh
         hundredths_of_seconds = int(total_ms / ms_per_hundredth_second)
 
-        # Now update the sprites
-        self.set_time(minutes, seconds, hundredths_of_seconds)
+        # There are only two digits for the minutes, past 99:59:99 the display stays there (the
+        # elapsed time keeps counting)
+        if minutes > 99:
+            minutes, seconds, hundredths_of_seconds = 99, 59, 99
 
-        # Ensure the digits are placed correctly
-        if (self.rect != self.last_rect):
-            self.last_rect = self.rect
-            self.position_digits()
+        # Now update the composited image (if the displayed time changed)
+        self.set_time(minutes, seconds, hundredths_of_seconds)
 
     def draw(self):
         """Draw the visual representation of the clock"""
-        self.screen.blit(self.frame_image, self.rect)
-        self.digits.draw(self.screen)
+        self.screen.blit(self.image, self.rect)
@@ -0,0 +1,117 @@
+"""This module implements the render-free state observation of the tilemap for Py-Climber"""
+
+# numpy is optional, without it ClimberEnv falls back to a dict summary
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class ObservationBuilder():
+    """Reads the game state straight off the tilemap into fixed-shape numpy arrays, without
+    drawing anything.  The arrays are allocated once and filled in place by build(), so the same
+    dict of arrays comes back every tick (copy them to keep an observation).  Positions are in
+    screen pixels:
+
+        blocks      (rows, cols) uint8      1 where a block is, one cell per block over the playable area
+        enemies     (max enemies, 5)        x, y, dx, dy, dying of each live blob in spawn order, 0 after
+        enemy_count ()                      number of live blobs (rows of enemies in use)
+        player      (9,)                    x, y, dx, dy, falling, dying, idle_top, air_jumps, facing_left
+        exit        (2, 4)                  left, top, width, height of the drain, then of the blade
+        timer       ()                      level time elapsed, in milliseconds
+    """
+
+    @staticmethod
+    def available():
+        """The builder can only be used if numpy is installed"""
+        return numpy is not None
+
+    @staticmethod
+    def get_shapes(settings, tile_map):
+        """{name: (shape, dtype)} of the observation arrays for the map"""
+        block_rect = tile_map.block_image.get_rect()
+        bounds = tile_map.player_bounds_rect
+        return {
+            'blocks': ((bounds.height // block_rect.height, bounds.width // block_rect.width), numpy.uint8),
+            'enemies': ((settings.enemy_max_population, 5), numpy.float32),
+            'enemy_count': ((), numpy.int32),
+            'player': ((9,), numpy.float32),
+            'exit': ((2, 4), numpy.float32),
+            'timer': ((), numpy.float32),
+        }
+
+    @staticmethod
+    def create_buffers(settings, tile_map, batch_shape=()):
+        """Allocate zeroed observation arrays, with batch_shape in front of each (e.g. (N,) for N games)"""
+        shapes = ObservationBuilder.get_shapes(settings, tile_map)
+        return {name: numpy.zeros(tuple(batch_shape) + shape, dtype=dtype) for name, (shape, dtype) in shapes.items()}
+
+    def __init__(self, settings, tile_map, buffers=None):
+        """Init the builder for the map, filling the given buffers (e.g. one game's slice of a
+        batch, see create_buffers) or its own"""
+        self.settings = settings
+        self.tile_map = tile_map
+        if buffers is None:
+            buffers = self.create_buffers(settings, tile_map)
+        self.observation = buffers
+
+        # The blocks only change when the grid does, and only the rows of enemies that were in
+        # use last time need clearing
+        self.block_grid = None
+        self.block_grid_version = None
+        self.enemy_rows_used = 0
+
+    def build(self):
+        """Fill the arrays with the current state and return them"""
+        tile_map = self.tile_map
+        observation = self.observation
+        self.build_blocks()
+        self.build_enemies()
+
+        player = tile_map.player
+        observation['player'][:] = (player.rect.x, player.rect.y, player.dx, player.dy, player.falling, player.dying,
+            player.idle_top, player.air_jumps, player.facing_left)
+        observation['exit'][:] = (tuple(tile_map.drainrect), tuple(tile_map.blob_exit.rect))
+        observation['timer'][()] = tile_map.level_timer.elapsed_time_ms
+        return observation
+
+    def build_blocks(self):
+        """Redraw the block occupancy if the grid changed since the last build"""
+        block_grid = self.tile_map.block_grid
+        if block_grid is self.block_grid and block_grid.version == self.block_grid_version:
+            return
+        self.block_grid = block_grid
+        self.block_grid_version = block_grid.version
+
+        # The grid's cells are block sized and start at the top left of the playable area
+        blocks = self.observation['blocks']
+        rows, cols = blocks.shape
+        blocks.fill(0)
+        for (col, row), cell_blocks in block_grid.cells.items():
+            if cell_blocks and 0 <= row < rows and 0 <= col < cols:
+                blocks[row, col] = 1
+
+    def build_enemies(self):
+        """Copy the live blobs into the leading rows of the enemies array"""
+        enemies = self.tile_map.enemies
+        rows = self.observation['enemies']
+        blob_engine = self.tile_map.blob_engine
+        if blob_engine is not None:
+            # The vectorized engine already holds the state in arrays
+            slots = blob_engine.get_slots()[:len(rows)]
+            count = len(slots)
+            rows[:count, 0] = blob_engine.left[slots]
+            rows[:count, 1] = blob_engine.top[slots]
+            rows[:count, 2] = blob_engine.dx[slots]
+            rows[:count, 3] = blob_engine.dy[slots]
+            rows[:count, 4] = blob_engine.dying[slots]
+        else:
+            # One conversion for the lot is much cheaper than writing the rows one at a time
+            state = [(enemy.rect.x, enemy.rect.y, enemy.dx, enemy.dy, enemy.dying) for enemy in enemies][:len(rows)]
+            count = len(state)
+            if count:
+                rows[:count] = state
+
+        if count < self.enemy_rows_used:
+            rows[count:self.enemy_rows_used] = 0
+        self.enemy_rows_used = count
+        self.observation['enemy_count'][()] = count
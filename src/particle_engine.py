@@ -0,0 +1,196 @@
+"""Vectorized particle engine for Py-Climber, an optional drop-in for ParticleGenerator"""
+import pygame
+
+# numpy is optional, without it the game falls back to ParticleGenerator
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class ParticleEngine():
+    """The ParticleEngine class has the same interface as ParticleGenerator (start/stop/update/draw
+    and the optional generator callback), but keeps the particles as a structure of numpy arrays
+    so that updating, culling and drawing them doesn't loop over particles in python
+    """
+
+    # Starting size of the arrays, they double whenever they fill up
+    initial_capacity = 256
+
+    @staticmethod
+    def available():
+        """The engine can only be used if numpy is installed"""
+        return numpy is not None
+
+    def __init__(self, screen, settings, color, x, y, generator_callback=None):
+        """Init the position and color, and the (empty) particle arrays"""
+        self.screen = screen
+        self.screen_rect = self.screen.get_rect()
+        self.settings = settings
+        self.x = x
+        self.y = y
+        self.color = color
+        self.active = False
+        self.active_frames = 0
+        self.frames_to_generate = 0
+        self.callback = generator_callback
+
+        # Particle state, only the first 'count' entries are alive
+        self.count = 0
+        self.particle_x = numpy.zeros(self.initial_capacity)
+        self.particle_y = numpy.zeros(self.initial_capacity)
+        self.particle_dx = numpy.zeros(self.initial_capacity)
+        self.particle_dy = numpy.zeros(self.initial_capacity)
+        self.particle_width = numpy.zeros(self.initial_capacity, dtype=numpy.int32)
+        self.particle_color = numpy.zeros((self.initial_capacity, 3), dtype=numpy.uint32)
+
+    def start(self, frames_to_generate):
+        """Tells the generator to start generating particles"""
+        self.active = True
+        self.active_frames = 0
+        self.frames_to_generate = frames_to_generate
+
+    def stop(self):
+        """Tells the generator to stop generating particles"""
+        self.active = False
+        self.active_frames = 0
+        # start() dictates the duration
+        self.frames_to_generate = 0
+
+    def get_particle_count(self):
+        """Number of particles currently alive"""
+        return self.count
+
+    def get_rects(self):
+        """Returns the area covered by the particles, as a single bounding rect since there can be a lot of them"""
+        if self.count == 0:
+            return []
+        n = self.count
+        left = int(self.particle_x[:n].min())
+        top = int(self.particle_y[:n].min())
+        right = int(self.particle_x[:n].max()) + int(self.particle_width[:n].max())
+        bottom = int(self.particle_y[:n].max()) + int(self.particle_width[:n].max())
+        # Pad for the truncation of the float positions
+        return [pygame.Rect(left - 1, top - 1, right - left + 2, bottom - top + 2)]
+
+    def update(self):
+        """Update the position of all alive particles"""
+        # Same as ParticleGenerator, 'active' only controls generation, particles
+        # already in flight always finish out their lives
+        if self.active:
+            self.generate_particles(self.settings.particle_gen_per_frame)
+            self.active_frames += 1
+            if self.active_frames > self.frames_to_generate:
+                self.stop()
+
+        n = self.count
+        if n == 0:
+            return
+
+        # Move everything at once, see Particle.update for the per-particle version
+        self.particle_x[:n] += self.particle_dx[:n]
+        self.particle_dy[:n] += self.settings.gravity
+        numpy.minimum(self.particle_dy[:n], self.settings.terminal_velocity, out=self.particle_dy[:n])
+        self.particle_y[:n] += self.particle_dy[:n]
+
+        # Once a particle has left the screen it's dead, compact the survivors to the front
+        alive = self.particle_y[:n] <= self.screen_rect.bottom
+        alive_count = int(numpy.count_nonzero(alive))
+        if alive_count < n:
+            for array in self.get_arrays():
+                array[:alive_count] = array[:n][alive]
+            self.count = alive_count
+
+    def get_arrays(self):
+        """All of the per-particle arrays"""
+        return [self.particle_x, self.particle_y, self.particle_dx, self.particle_dy, self.particle_width, self.particle_color]
+
+    def reserve(self, capacity):
+        """Make sure the arrays can hold at least capacity particles"""
+        current_capacity = len(self.particle_x)
+        if capacity <= current_capacity:
+            return
+
+        while current_capacity < capacity:
+            current_capacity *= 2
+
+        resized_arrays = []
+        for array in self.get_arrays():
+            resized_array = numpy.zeros((current_capacity,) + array.shape[1:], dtype=array.dtype)
+            resized_array[:self.count] = array[:self.count]
+            resized_arrays.append(resized_array)
+        (self.particle_x, self.particle_y, self.particle_dx, self.particle_dy,
+            self.particle_width, self.particle_color) = resized_arrays
+
+    def generate_particles(self, number_of_new_particles):
+        """Create new particles at the generator's location and give them an initial velocity"""
+        # In the callback case the implementer controls it all, including the number
+        rng = self.settings.rng.particles
+        particle_data = []
+        if self.callback:
+            particle_data = self.callback()
+        else:
+            # No callback, so make some random ones by default
+            for particle_index in range(0, number_of_new_particles):
+                new_data = (rng.randint(-2, 2), rng.randint(5, 20) * -1, (rng.randint(0,255), rng.randint(0,255), rng.randint(0,255)))
+                particle_data.append(new_data)
+
+        new_count = len(particle_data)
+        if new_count == 0:
+            return
+
+        start = self.count
+        end = start + new_count
+        self.reserve(end)
+        self.particle_x[start:end] = self.x
+        self.particle_y[start:end] = self.y
+        self.particle_dx[start:end] = [particle_info[0] for particle_info in particle_data]
+        self.particle_dy[start:end] = [particle_info[1] for particle_info in particle_data]
+        self.particle_color[start:end] = [tuple(particle_info[2])[:3] for particle_info in particle_data]
+        self.particle_width[start:end] = [rng.randint(1, 4) for particle_info in particle_data]
+        self.count = end
+
+    def draw(self):
+        """Draw all of the particles"""
+        n = self.count
+        if n == 0:
+            return
+
+        # Setting up pixels2d costs more than it saves for the few hundred particles a blob exit
+        # throws, so those are filled one at a time.  pixels2d also can't reference 24 bit surfaces
+        if n < self.settings.particle_engine_pixels_min_count or self.screen.get_bytesize() not in (2, 4):
+            self.draw_fills(n)
+            return
+
+        # Map the colors to the screen's pixel format
+        shifts = self.screen.get_shifts()
+        losses = self.screen.get_losses()
+        colors = self.particle_color[:n]
+        mapped = ((colors[:, 0] >> losses[0]) << shifts[0]) | ((colors[:, 1] >> losses[1]) << shifts[1]) | ((colors[:, 2] >> losses[2]) << shifts[2])
+        if self.screen.get_masks()[3]:
+            mapped |= self.screen.get_masks()[3]
+
+        # Same truncation a Rect applies to the float positions
+        xs = self.particle_x[:n].astype(numpy.int64)
+        ys = self.particle_y[:n].astype(numpy.int64)
+        widths = self.particle_width[:n]
+        width, height = self.screen.get_size()
+
+        # Particles are small squares (1-4 pixels), so write one pixel offset within the square at a time
+        pixels = pygame.surfarray.pixels2d(self.screen)
+        for offset_y in range(0, int(widths.max())):
+            for offset_x in range(0, int(widths.max())):
+                px = xs + offset_x
+                py = ys + offset_y
+                visible = (widths > offset_x) & (widths > offset_y) & (px >= 0) & (px < width) & (py >= 0) & (py < height)
+                pixels[px[visible], py[visible]] = mapped[visible]
+        # Releases the surface lock
+        del pixels
+
+    def draw_fills(self, n):
+        """Draw the first n particles with a fill each"""
+        # One conversion per array, rather than per particle
+        fill = self.screen.fill
+        xs = self.particle_x[:n].astype(numpy.int64).tolist()
+        ys = self.particle_y[:n].astype(numpy.int64).tolist()
+        for x, y, width, color in zip(xs, ys, self.particle_width[:n].tolist(), self.particle_color[:n].tolist()):
+            fill(color, (x, y, width, width))
@@ -1,6 +1,6 @@
 """Particle generator for Py-Climber"""
 from src.particle import Particle
-import random
+import pygame
 
 class ParticleGenerator():
     """The ParticleGenerator class is responsible for creating and tracking Particle
@@ -50,16 +50,26 @@ class ParticleGenerator():
                 self.stop()
 
         # For any particles still alive, we need to update them, even if the 
-        # generator is stopped.  Once a particle is 'dead', remove it
+        # generator is stopped.  Once a particle is 'dead', remove it (rebuilding the
+        # list rather than removing while iterating, which skips the next particle)
         for particle in self.particles:
-            particle.update()
-            if not particle.alive():
-                self.particles.remove(particle)
+            particle.update(self.settings)
+        self.particles = [particle for particle in self.particles if particle.alive(self.screen_rect)]
+
+    def get_particle_count(self):
+        """Number of particles currently alive"""
+        return len(self.particles)
+
+    def get_rects(self):
+        """Returns the rects covered by the particles"""
+        # Particles are drawn at float positions, pad them a little to cover rounding
+        return [pygame.Rect(particle.x - 1, particle.y - 1, particle.width + 2, particle.width + 2) for particle in self.particles]
 
     def generate_particles(self, number_of_new_particles):
         """Create a new particle at the generator's location and give it an initial velocity"""
         # In the callback case the implementer controls it all, including the number
         # create an empty list to hold the data
+        rng = self.settings.rng.particles
         particle_data = []
         if self.callback:
             # We have a callback, so delegate all of the work....
@@ -67,13 +77,13 @@ class ParticleGenerator():
         else:
             # No callback, so make some random ones by default
             for particle_index in range(0, number_of_new_particles):
-                new_data = (random.randint(-2, 2), random.randint(5, 20) * -1, (random.randint(0,255), random.randint(0,255), random.randint(0,255)))
+                new_data = (rng.randint(-2, 2), rng.randint(5, 20) * -1, (rng.randint(0,255), rng.randint(0,255), rng.randint(0,255)))
                 particle_data.append(new_data)
 
         # Callback or not, at this point we should have a list of particle data
         for particle_info in particle_data:
             # Create a new particle object
-            new_particle = Particle(self.screen, self.settings, self.x, self.y, particle_info[0], particle_info[1], random.randint(1, 4), particle_info[2])
+            new_particle = Particle(self.x, self.y, particle_info[0], particle_info[1], rng.randint(1, 4), particle_info[2])
             
             # Add it to the list to track/draw
             self.particles.append(new_particle)
@@ -83,4 +93,4 @@ class ParticleGenerator():
         # Since the are not pygame.sprites, can't just use the Group as with the blobs
         # Just another way to do things
         for particle in self.particles:
-            particle.draw()
+            particle.draw(self.screen)
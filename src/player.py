@@ -8,6 +8,9 @@ import pygame
 class Player(AnimatedSprite):
     """Player object"""
 
+    __slots__ = ('tile_map', 'initial_bounding_rect', 'enemies', 'air_jumps', 'max_air_jumps', 'idle_top',
+        'idle_counter', 'won_level', 'at_top')
+
     def __init__(self, settings, screen, images, initial_bounding_rect, tile_map):
         """Initialize the player sprite"""
         # Calls AnimatedSprite, which in turn will call pygame.Sprite __init_()
@@ -36,16 +39,7 @@ class Player(AnimatedSprite):
         self.won_level = False
         self.at_top = False
 
-        # Add the animations for the player
-        self.animations[self.settings.anim_name_idle_left] = Animation([0, 1, 2, 3, 2, 1], 5)
-        self.animations[self.settings.anim_name_idle_right] = Animation([5, 6, 7, 8, 7, 6], 5)
-        self.animations[self.settings.anim_name_walk_left] = Animation([0, 10, 11, 10], 2)
-        self.animations[self.settings.anim_name_walk_right] = Animation([5, 12, 13, 12], 2)
-        self.animations[self.settings.anim_name_jump_up_left] = Animation([15], 5)
-        self.animations[self.settings.anim_name_jump_down_left] = Animation([16], 5)
-        self.animations[self.settings.anim_name_jump_up_right] = Animation([17], 5)
-        self.animations[self.settings.anim_name_jump_down_right] = Animation([18], 5)
-        self.animations[self.settings.anim_name_dead] = Animation([4], 5)
+        # Start out idle, facing left
         self.current_animation = self.settings.anim_name_idle_left
         self.facing_left = True
 
@@ -61,6 +55,30 @@ class Player(AnimatedSprite):
         player.won_level = False
         player.at_top = False
 
+    def restart(self):
+        """Put the player back where a new game starts, standing still in the middle and facing left"""
+        self.reset()
+        self.rect.left = self.screen.get_rect().width / 2
+        self.falling = False
+        self.falling_frames = 0
+        self.air_jumps = 0
+        self.facing_left = True
+        self.set_current_animation(self.settings.anim_name_idle_left)
+
+    def create_animations(self):
+        """The animations for the player"""
+        return {
+            self.settings.anim_name_idle_left: Animation([0, 1, 2, 3, 2, 1], 5),
+            self.settings.anim_name_idle_right: Animation([5, 6, 7, 8, 7, 6], 5),
+            self.settings.anim_name_walk_left: Animation([0, 10, 11, 10], 2),
+            self.settings.anim_name_walk_right: Animation([5, 12, 13, 12], 2),
+            self.settings.anim_name_jump_up_left: Animation([15], 5),
+            self.settings.anim_name_jump_down_left: Animation([16], 5),
+            self.settings.anim_name_jump_up_right: Animation([17], 5),
+            self.settings.anim_name_jump_down_right: Animation([18], 5),
+            self.settings.anim_name_dead: Animation([4], 5),
+        }
+
     def update_current_animation(self):
         """Set the correct animation based on state"""
         # DEAD
@@ -123,9 +141,10 @@ class Player(AnimatedSprite):
                     self.air_jumps = 0
 
                 # The player needs to also check against the group of enemy sprites
-                intersected_blobs = pygame.sprite.spritecollide(self, enemies, False, self.collision_check)
+                intersected_blobs = tile_map.enemy_broadphase.collide_sprite(self, self.collision_check, 'player')
                 if intersected_blobs:
                     self.dying = True
+                    tile_map.player_deaths += 1
                     self.dy = -15
                     self.falling = True
                     self.falling_frames = 1
@@ -173,7 +192,7 @@ class Player(AnimatedSprite):
                     self.dy = 0
                     self.rect.top = block.rect.bottom - self.settings.player_sprite_top_margin
                     # remove blocks struck from the bottom
-                    group.remove(collision_list)
+                    self.tile_map.remove_blocks(collision_list)
 
                     # remove enemies above those blocks
                     self.remove_enemies_above_blocks(collision_list)
@@ -198,9 +217,9 @@ class Player(AnimatedSprite):
         kill_rect.move_ip(0, collision_list[0].rect.height * -1)
 
         # Now see if any enemies are in this block
-        for enemy in self.enemies:
-            if kill_rect.colliderect(enemy.rect):
-                enemy.dying = True
-                enemy.dy = self.settings.enemy_death_dy
-                bonus = TimeBonus(enemy.rect, "-0.5 seconds", 500, self.tile_map.level_timer, self.settings.bonus_font)
-                self.tile_map.bonuses.append(bonus)
+        for enemy in self.tile_map.enemy_broadphase.collide_rect(kill_rect, 0, 'kill'):
+            enemy.dying = True
+            enemy.dy = self.settings.enemy_death_dy
+            self.tile_map.blobs_killed += 1
+            bonus = TimeBonus(enemy.rect, "-0.5 seconds", 500, self.tile_map.level_timer, self.settings.bonus_font, self.settings.text_cache, self.settings.rng.effects)
+            self.tile_map.bonuses.append(bonus)
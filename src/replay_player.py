@@ -0,0 +1,58 @@
+"""This module implements replaying a recorded session for Py-Climber"""
+
+from src.replay_recorder import (replay_magic, replay_version, replay_header, replay_record,
+    record_key_down, record_key_up, record_checksum)
+import pygame
+
+class ReplayPlayer():
+    """Loads a file written by ReplayRecorder and hands back the key events for each tick.  The game
+    state checksums are compared against the recorded ones, the first tick they differ on is kept"""
+
+    def __init__(self, path):
+        """Load the whole recording"""
+        with open(path, 'rb') as replay_file:
+            data = replay_file.read()
+
+        if len(data) < replay_header.size:
+            raise ValueError('{} is not a Py-Climber replay'.format(path))
+        magic, version, self.seed, self.checksum_interval = replay_header.unpack_from(data, 0)
+        if magic != replay_magic or version != replay_version:
+            raise ValueError('{} is not a version {} Py-Climber replay'.format(path, replay_version))
+
+        # tick -> [(key_down, key)] and tick -> checksum
+        self.key_events = {}
+        self.checksums = {}
+        self.last_tick = -1
+        for record_type, tick, value in replay_record.iter_unpack(data[replay_header.size:]):
+            if record_type == record_checksum:
+                self.checksums[tick] = value
+            elif record_type in (record_key_down, record_key_up):
+                self.key_events.setdefault(tick, []).append((record_type == record_key_down, value))
+            else:
+                raise ValueError('{} has an unknown record type {}'.format(path, record_type))
+            self.last_tick = max(self.last_tick, tick)
+
+        self.checksums_checked = 0
+        self.diverged_tick = None
+
+    def get_key_events(self, tick):
+        """The key events to handle before the tick, as pygame events"""
+        events = []
+        for key_down, key in self.key_events.get(tick, []):
+            event_type = pygame.KEYDOWN if key_down else pygame.KEYUP
+            events.append(pygame.event.Event(event_type, key=key, mod=0, unicode='', scancode=0))
+        return events
+
+    def check_checksum(self, tick, checksum):
+        """Compare the state after the tick with the recording, returns the first tick it diverged
+        on (kept in diverged_tick), or None while it matches"""
+        recorded_checksum = self.checksums.get(tick)
+        if recorded_checksum is not None:
+            self.checksums_checked += 1
+            if recorded_checksum != checksum and self.diverged_tick is None:
+                self.diverged_tick = tick
+        return self.diverged_tick
+
+    def is_finished(self, tick):
+        """True once every recorded tick has been replayed"""
+        return tick > self.last_tick
@@ -0,0 +1,43 @@
+"""This module implements recording a session's input (and state checksums) for Py-Climber"""
+
+import struct
+
+# File layout: a header (magic, version, session seed, checksum interval) followed by fixed size
+# records of (record type, simulation tick, value).  The value is the key for key events and the
+# state checksum for checksum records
+replay_magic = b'PYCR'
+replay_version = 1
+replay_header = struct.Struct('<4sHQI')
+replay_record = struct.Struct('<BII')
+record_key_down = 0
+record_key_up = 1
+record_checksum = 2
+
+class ReplayRecorder():
+    """Logs key events by the simulation tick they were handled before, plus a checksum of the game
+    state after every checksum_interval ticks, so ReplayPlayer can reproduce the session and spot
+    where a replay diverges"""
+
+    def __init__(self, path, seed, checksum_interval):
+        """Open the file and write the header"""
+        if seed < 0 or seed >= 2 ** 64:
+            raise ValueError('Recorded sessions need a seed in the range 0 to 2^64-1')
+        self.path = path
+        self.checksum_interval = checksum_interval
+        self.file = open(path, 'wb')
+        self.file.write(replay_header.pack(replay_magic, replay_version, seed, checksum_interval))
+
+    def record_key(self, tick, key_down, key):
+        """Log a key press (key_down True) or release"""
+        record_type = record_key_down if key_down else record_key_up
+        self.file.write(replay_record.pack(record_type, tick, key))
+
+    def record_checksum(self, tick, checksum):
+        """Log the state checksum after the tick, if it falls on the interval"""
+        if tick % self.checksum_interval == 0:
+            self.file.write(replay_record.pack(record_checksum, tick, checksum))
+
+    def close(self):
+        """Flush and close the file, nothing more can be recorded"""
+        if not self.file.closed:
+            self.file.close()
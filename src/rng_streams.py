@@ -0,0 +1,27 @@
+"""This module implements the seedable random number streams for Py-Climber"""
+
+import random
+
+class RngStreams():
+    """One random.Random per subsystem, all derived from a single session seed.  Each subsystem
+    draws from its own stream, so e.g. the particles a gib throws can't change where the next
+    enemy spawns, and a session can be reproduced from its seed (and input, see replay_recorder.py
+    and replay_player.py)"""
+
+    # map: platforms, enemies: spawning, particles: gibs, effects: cosmetic (bonus text colors)
+    stream_names = ('map', 'enemies', 'particles', 'effects')
+
+    def __init__(self, seed=None):
+        """Create the streams, see seed()"""
+        self.seed_value = None
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        """Reseed every stream from the session seed, a random one is picked (and kept in
+        seed_value so the session can still be recorded) if it's None"""
+        if seed is None:
+            seed = random.SystemRandom().randrange(0, 2 ** 32)
+        self.seed_value = seed
+        for name in self.stream_names:
+            # String seeds are hashed with sha512, so the derived streams are stable across runs
+            setattr(self, name, random.Random('{}:{}'.format(seed, name)))
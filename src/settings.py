@@ -1,4 +1,9 @@
 """This module implements settings for Py-Climber."""
+from src.text_cache import TextCache
+from src.animation import AnimationClock
+from src.frame_profiler import FrameProfiler
+from src.rng_streams import RngStreams
+import copy
 import pygame.freetype
 
 class Settings():
@@ -14,6 +19,19 @@ class Settings():
         self.bg_color = (26, 23, 22)
         self.color_key = (255, 0, 255)
         self.fullscreen = False
+        # Opt-in renderer which only restores and pushes the regions that changed
+        self.dirty_rect_rendering = False
+        # Set by run_game when dirty_rect_rendering is enabled
+        self.renderer = None
+
+        # Keep each sprite sheet once and use subsurface views for the frames rather than
+        # copying every frame into its own surface.  Loads faster, but the views can't be RLE
+        # accelerated so they blit slower (see benchmarks/bench_atlas.py)
+        self.image_atlas = False
+
+        # Load the images from this asset pack (baked by pyclimber_assets.py) when it's there and
+        # up to date with the bitmaps, None always loads the bitmaps
+        self.asset_pack_path = 'images/assets.pack'
 
         # quick font
         self.font = pygame.freetype.SysFont(None, 16)
@@ -22,6 +40,51 @@ class Settings():
         # Bonus font
         self.bonus_font = pygame.freetype.SysFont(None, 10)
 
+        # Frame stage profiler, F3 toggles it and its overlay.  Samples kept per stage, and how
+        # many frames the overlay text is kept before it's re-rendered
+        self.profiler_window = 120
+        self.profiler_refresh_frames = 15
+        self.profiler_font = pygame.freetype.SysFont('monospace', 12)
+        self.profiler = FrameProfiler(self.profiler_window, self.profiler_refresh_frames)
+
+        # Rendered text surfaces (help text, bonuses), least recently used are dropped first
+        self.text_cache_size = 32
+        self.text_cache = TextCache(self.text_cache_size)
+
+        # The simulation advances in fixed ticks of game time, the physics settings below are all per tick
+        self.simulation_tick_ms = 1000 / 30
+        # How fast the simulation runs compared to real time (e.g. 2 or 10), 0 runs it as fast as possible
+        self.simulation_speed = 1
+        # At most this many ticks run between renders so a slow frame can't snowball, when running
+        # as fast as possible it is the number of ticks run per render
+        self.simulation_max_ticks_per_render = 30
+        # Renders per second (when not running as fast as possible), and whether to render at all
+        self.render_fps = 30
+        self.render_enabled = True
+
+        # Random number streams for the map, enemies, particles and effects, seed them with rng.seed()
+        self.rng = RngStreams()
+
+        # Key events are recorded to / replayed from a file when these are set (see replay_recorder.py
+        # and replay_player.py), a state checksum is recorded and checked every replay_checksum_interval ticks
+        self.recorder = None
+        self.replayer = None
+        self.replay_checksum_interval = 1
+
+        # Agent environment (see climber_env.py), the reward for each level won, death and blob
+        # killed, plus a small cost per tick so dawdling doesn't pay
+        self.env_reward_level_won = 10.0
+        self.env_reward_player_died = -1.0
+        self.env_reward_blob_killed = 0.1
+        self.env_reward_per_tick = -0.001
+        # Ticks each step() holds its action for, and when an episode ends (0 for no limit)
+        self.env_ticks_per_step = 1
+        self.env_max_ticks = 30 * 60 * 3
+        self.env_level_limit = 1
+
+        # Drives every sprite animation, ticks once per map update
+        self.animation_clock = AnimationClock()
+
         # Global sprite settings
         self.gravity = 1.4
         self.terminal_velocity = 12
@@ -80,6 +143,14 @@ class Settings():
         self.enemy_generation_rate = self.enemy_generation_base_rate
         # amount to decrease rate per level
         self.enemy_generation_level_rate = 5
+        # the rate never drops below this, the minimum number of frames between spawns
+        self.enemy_generation_min_rate = 15
+        # most blobs alive at once, further spawns are dropped
+        self.enemy_max_population = 250
+        # Cell size (pixels) of the grid used to find enemies near the player, blade, etc.
+        self.enemy_broadphase_cell_size = 48
+        # Simulate all of the blobs at once with numpy (BlobEngine) instead of a Blob object each
+        self.blob_engine_vectorized = False
         
         # Tile settings
         self.tile_width = 24
@@ -91,6 +162,11 @@ class Settings():
         self.particle_gen_dy_range = (5, 20)
         self.particle_gen_max_frames = 40
         self.particle_gen_per_frame = 5
+        # Use the numpy based ParticleEngine when numpy is installed
+        self.particle_engine_vectorized = True
+        # Below this many particles ParticleEngine.draw fills them one at a time, pixels2d only
+        # pays for its setup past about 500 of them (a blob exit throws about 100)
+        self.particle_engine_pixels_min_count = 500
         
         # Map settings
         self.map_width = 16
@@ -100,3 +176,16 @@ class Settings():
         self.map_number_floors = 8
         self.map_number_subfloors = 1
 
+    def copy_for_game(self):
+        """A copy of the settings for another game running alongside this one (see climber_batch_env.py).
+        The fonts, images and caches are shared, but the state a game changes as it runs (the random
+        streams, the animation clock, the enemy generation rate and the map indices) is its own"""
+        game_settings = copy.copy(self)
+        game_settings.rng = RngStreams(self.rng.seed_value)
+        game_settings.animation_clock = AnimationClock()
+        game_settings.map_indicies = list(self.map_indicies)
+        # Drawing, recording and replaying belong to the original game
+        game_settings.renderer = None
+        game_settings.recorder = None
+        game_settings.replayer = None
+        return game_settings
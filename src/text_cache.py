@@ -0,0 +1,45 @@
+"""This module implements a cache of rendered text surfaces for Py-Climber"""
+
+from collections import OrderedDict
+
+class TextCache():
+    """Rendering text with pygame.freetype is expensive, so keep recently rendered surfaces
+    around keyed by (font, text, size, color).  The least recently used entry is evicted once
+    the cache is full.  Hit/miss counts are kept to judge whether the capacity is right."""
+
+    def __init__(self, capacity):
+        """Init an empty cache which holds at most capacity surfaces"""
+        self.capacity = capacity
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, create_surface):
+        """Returns the surface for key, calling create_surface() to make it on a miss"""
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = create_surface()
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def render(self, font, text, color, size=0):
+        """Returns a surface with the text rendered in the given font/size/color (transparent background)"""
+        return self.get((font, text, size, color), lambda: font.render(text, color, size=size)[0])
+
+    def clear(self):
+        """Drop every cached surface, the counters are kept"""
+        self.surfaces.clear()
+
+    def get_stats(self):
+        """Returns the counters as a dict, handy for logging"""
+        return {'size': len(self.surfaces), 'capacity': self.capacity, 'hits': self.hits,
+            'misses': self.misses, 'evictions': self.evictions}
@@ -1,14 +1,20 @@
 """This module implements a 2D tilemap for Py-Climber"""
 from src.player import Player
 from src.block import Block
+from src.block_grid import BlockGrid
+from src.blob_engine import BlobEngine
+from src.blob_pool import BlobPool
+from src.enemy_broadphase import EnemyBroadphase
 from src.blob_exit import BlobExit
+from src.level_builder import LevelBuilder
+from src.level_data import LevelData
 from src.level_info import LevelInfo
 from src.level_timer import LevelTimer
 from src.time_bonus import TimeBonus
 import src.game_functions as gf
-import random
 from pygame.sprite import Group
 import pygame
+import zlib
 
 class Tilemap():
     """Represents a collection of tile (sprites) that represent a map"""
@@ -23,6 +29,15 @@ class Tilemap():
         self.player_bounds_rect = pygame.Rect((0,0), (0,0))
         self.block_image = block_image
         self.block_group = Group()
+        # Index over block_group for collision checks, rebuilt with the platforms
+        self.block_grid = BlockGrid((0, 0), 1, 1)
+        # Pre-rendered blocks, rebuilt by generate_platforms and patched by remove_blocks
+        self.block_layer = None
+        self.block_layer_rect = pygame.Rect((0,0), (0,0))
+        # Cells erased from the block layer since it was built, renderers can restore just these
+        self.removed_block_rects = []
+        # The next level's platforms, built a step per tick while the player waits at the top
+        self.next_level = None
         self.x_offset = 0
         self.drainrect = pygame.Rect((0,0), (0,0))
         self.blob_exit = None
@@ -31,22 +46,74 @@ class Tilemap():
         self.player_images = player_images
         self.blob_images = blob_images
         self.enemies = Group()
+        # Rebuilt each update, shared by everything that checks against the enemies
+        self.enemy_broadphase = EnemyBroadphase(self.settings.enemy_broadphase_cell_size)
+        # Blobs are recycled, and the pool's capacity caps the population
+        self.blob_pool = BlobPool(self.settings, self.screen, self.blob_images, self.settings.enemy_max_population)
+        # The vectorized engine stands in for both the enemies Group and the broadphase
+        self.blob_engine = None
+        if self.settings.blob_engine_vectorized and BlobEngine.available():
+            self.blob_engine = BlobEngine(self.settings, self.screen, self.blob_images)
+            self.enemies = self.blob_engine
+            self.enemy_broadphase = self.blob_engine
         self.new_enemy_counter = 0
         self.level_info = LevelInfo(self.settings, self.screen)
+        # Levels cleared, player deaths and blobs killed by the player since the last reset
+        self.levels_cleared = 0
+        self.player_deaths = 0
+        self.blobs_killed = 0
         self.level_timer = LevelTimer(self.settings, self.screen)
         self.bonuses = []
+
+        # Pre-rendered tile layer(s), keyed by the grid overlay flag.  These are only
+        # rebuilt when the indices, tile images or screen change (see get_tile_layer)
+        self.tile_layers = {}
+        self.tile_layer_rect = pygame.Rect((0,0), (0,0))
+        self.tile_layer_key = None
+        # Bumped whenever the indices are replaced, so the tile layer key doesn't
+        # have to compare every index each frame
+        self.layout_version = 0
         
-    def reset(self):
-        """Resets the game to the starting state"""
-        self.player.reset()
-        self.enemies.empty()
+    def reset(self, level=None):
+        """Resets the game to the starting state, on the saved level (see level_data.py) if one is given"""
+        self.player.restart()
+        self.clear_enemies()
+        self.new_enemy_counter = 0
+        self.bonuses.clear()
         gf.generate_new_random_blob(self.settings, self.screen, self.settings.image_res.enemy_blob_images, self)
-        self.generate_platforms()
+        if level is None:
+            self.generate_platforms()
+        else:
+            self.load_level(level)
         self.blob_exit.stop_gibbing()
         self.level_info = LevelInfo(self.settings, self.screen)
+        self.levels_cleared = 0
+        self.player_deaths = 0
+        self.blobs_killed = 0
         self.settings.enemy_generation_rate = self.settings.enemy_generation_base_rate
         self.level_timer.reset()
 
+    def refresh_images(self):
+        """Pick up images that were re-converted by ImageResources.convert_to_display_format()"""
+        image_res = self.settings.image_res
+        # The image lists are updated in place, but single images are held directly
+        self.block_image = image_res.block_image
+        for block in self.block_group:
+            block.image = self.block_image
+        self.build_block_layer()
+        self.level_timer.refresh_images()
+        self.level_info.level_sprite.image = image_res.level_image
+        self.level_info.digit_tens.set_image()
+        self.level_info.digit_ones.set_image()
+        self.invalidate_tile_layer()
+
+    def clear_enemies(self):
+        """Remove every enemy, handing them back to the pool"""
+        if self.blob_engine is None:
+            for enemy in self.enemies:
+                self.blob_pool.release(enemy)
+        self.enemies.empty()
+
     def generate_basic_map(self, number_of_floors, number_of_subfloor_rows=0):
         """Builds a basic tiled map - this depends on the index ordering of the tiles image"""
         # Every 'floor' that is not the bottom or below contains 3 tile rows of the same pattern
@@ -81,6 +148,7 @@ class Tilemap():
         # Out with the old, in with the new
         self.indicies.clear()
         self.indicies.extend(new_indices)
+        self.layout_version += 1
 
         # Add the block platforms
         self.generate_platforms()
@@ -112,7 +180,7 @@ class Tilemap():
 
     def generate_block(self, x, y):
         """Create a new Block object at the given x,y and return it"""
-        new_block = Block(self.settings, self.screen, self.block_image)
+        new_block = Block(self.block_image)
         new_block.rect.top = y
         new_block.rect.left = x
         return new_block
@@ -138,6 +206,17 @@ class Tilemap():
 
     def generate_platforms(self):
         """Make groups of sprites that contain the blocks for the player to stand on"""
+        # Finish the level built so far, unless the map stream has been reseeded since it started
+        level = self.next_level
+        if level is None or level.rng is not self.settings.rng.map:
+            level = LevelBuilder(self)
+        self.next_level = None
+        level.finish()
+        self.install_platforms(level)
+
+    def generate_platform_rows(self, block_group, rng):
+        """Add the blocks for the player to stand on to block_group, one row of platforms for each
+        step of the iteration (see LevelBuilder)"""
 
         # Every block is contained within the self.player_bounds_rect
 
@@ -147,7 +226,6 @@ class Tilemap():
             (self.player_bounds_rect.width, self.settings.tile_width)) 
         
         
-        self.block_group.empty()
         for row in range(0, (self.settings.map_number_floors-1)):
             new_group = Group()
 
@@ -159,12 +237,95 @@ class Tilemap():
                 bounding_rect = pygame.Rect(0, 0, 0,0)
                 bounding_rect.top = row_rect.top
                 bounding_rect.left = row_rect.left + col * self.settings.tile_width
-                self.generate_blocks(bounding_rect, new_group, random.choice([True, False]), random.choice([True, False]))
+                self.generate_blocks(bounding_rect, new_group, rng.choice([True, False]), rng.choice([True, False]))
             
             # Each row is its own group.  This could limit collision checks later
-            self.block_group.add(new_group.sprites())
+            block_group.add(new_group.sprites())
             # Shif the bounding rect down one floor
             row_rect = row_rect.move(0, self.settings.tile_height * 3)
+            yield row
+
+    def generate_level_rows(self, block_group, level):
+        """Add the blocks of a saved level to block_group, one row of platforms for each step of the
+        iteration (see LevelBuilder)"""
+        block_rect = self.block_image.get_rect()
+        top = self.player_bounds_rect.top + self.settings.tile_height * 2
+        for row in range(0, level.floors):
+            for col in range(0, level.columns):
+                cell = level.get_cell(row, col)
+                left = self.player_bounds_rect.left + col * self.settings.tile_width
+                # In the order generate_blocks adds them
+                for bit, (quadrant_x, quadrant_y) in enumerate(LevelData.cell_quadrants):
+                    if cell & (1 << bit):
+                        block_group.add(self.generate_block(left + quadrant_x * block_rect.width, top + quadrant_y * block_rect.height))
+            top += self.settings.tile_height * 3
+            yield row
+
+    def load_level(self, level):
+        """Replace the tile indices and platforms with a saved level (see level_data.py)"""
+        if level.fingerprint != LevelData.get_fingerprint(self.settings):
+            raise ValueError('The level was saved with different map settings')
+        self.indicies[:] = level.indices
+        self.layout_version += 1
+        builder = LevelBuilder(self, level)
+        builder.finish()
+        self.install_platforms(builder)
+
+    def install_platforms(self, level):
+        """Swap in the platforms of a finished LevelBuilder"""
+        self.block_group = level.block_group
+        self.block_grid = level.block_grid
+        self.block_layer = level.block_layer
+        self.block_layer_rect = level.block_layer_rect
+        self.removed_block_rects.clear()
+
+    def create_block_grid(self, blocks):
+        """Index every block by the grid cells it covers, cells are the size of a block"""
+        image_rect = self.block_image.get_rect()
+        block_grid = BlockGrid(self.player_bounds_rect.topleft, image_rect.width, image_rect.height)
+        for block in blocks:
+            block_grid.add(block)
+        return block_grid
+
+    def build_block_grid(self):
+        """Rebuild the grid over the current blocks"""
+        self.block_grid = self.create_block_grid(self.block_group)
+
+    def create_block_layer(self, block_group):
+        """Render every block once onto a surface covering the whole block field, returns the
+        surface (None if there are no blocks) and where it goes"""
+        blocks = block_group.sprites()
+        if not blocks:
+            return None, pygame.Rect((0,0), (0,0))
+
+        layer_rect = blocks[0].rect.unionall([block.rect for block in blocks[1:]])
+        left, top = layer_rect.topleft
+
+        # Mostly transparent, so RLE makes the single large blit cheap
+        layer = pygame.Surface(layer_rect.size)
+        layer.fill(self.settings.color_key)
+        layer.set_colorkey(self.settings.color_key, pygame.RLEACCEL)
+        for block in blocks:
+            layer.blit(block.image, block.rect.move(-left, -top))
+        return layer, layer_rect
+
+    def build_block_layer(self):
+        """Re-render the block layer from the current blocks"""
+        self.removed_block_rects.clear()
+        self.block_layer, self.block_layer_rect = self.create_block_layer(self.block_group)
+
+    def remove_blocks(self, blocks):
+        """Remove blocks from the map, e.g. when they are struck from below by the player"""
+        self.block_group.remove(blocks)
+        for block in blocks:
+            self.block_grid.remove(block)
+
+        # Erase just the destroyed cells rather than rebuilding the whole layer
+        if self.block_layer:
+            left, top = self.block_layer_rect.topleft
+            for block in blocks:
+                self.block_layer.fill(self.settings.color_key, block.rect.move(-left, -top))
+                self.removed_block_rects.append(block.rect.copy())
 
     def update(self):
         """Update all owned objects (blocks, player, enemies, etc)"""
@@ -173,92 +334,209 @@ class Tilemap():
 
         # Check for a reset flag set on the player object
         if self.player.won_level:
-            self.player.reset()
-            self.enemies.empty()
-            gf.generate_new_random_blob(self.settings, self.screen, self.settings.image_res.enemy_blob_images, self)
-            self.generate_platforms()
-            self.blob_exit.stop_gibbing()
-            self.level_info.increase_level()
-            self.settings.enemy_generation_rate -= self.settings.enemy_generation_level_rate
-            self.level_timer.reset()
+            self.change_level()
+
+        # Index the enemies where they are now, the player and the exit query this
+        profiler = self.settings.profiler
+        profiler.begin('update.broadphase')
+        self.enemy_broadphase.rebuild(self.enemies)
+        profiler.end('update.broadphase')
 
         # Update the player
+        profiler.begin('update.player')
         self.player.update(self, self.enemies)
+        profiler.end('update.player')
+
+        # Build the next level while the player waits at the top to win this one
+        if self.player.idle_top:
+            profiler.begin('update.next_level')
+            if self.next_level is None:
+                self.next_level = LevelBuilder(self)
+            self.next_level.step()
+            profiler.end('update.next_level')
 
         # Check if it's time to add a new enemy to the map
+        profiler.begin('update.enemies')
         self.new_enemy_counter += 1
         if self.new_enemy_counter >= self.settings.enemy_generation_rate:
             self.new_enemy_counter = 0
             gf.generate_new_random_blob(self.settings, self.screen, self.settings.image_res.enemy_blob_images, self)
 
         # Update enemies that exist
-        for enemy in self.enemies:
-            enemy.update(self)
+        self.enemies.update(self)
+        profiler.end('update.enemies')
 
-        # Update the 'exit' sprite
+        # Update the 'exit' sprite (and its particles)
+        profiler.begin('update.exit')
         self.blob_exit.update(self.enemies)
+        profiler.end('update.exit')
 
         # Update the level info
+        profiler.begin('update.hud')
         self.level_info.update()
 
         # Update the level timer
         self.level_timer.update()
+        profiler.end('update.hud')
 
         # bonuses
+        profiler.begin('update.bonuses')
         for bonus in self.bonuses:
             bonus.update()
             if not bonus.alive():
                 self.bonuses.remove(bonus)
+        profiler.end('update.bonuses')
+
+        # Live counts for the profiler overlay
+        if profiler.enabled:
+            profiler.set_count('enemies', len(self.enemies))
+            profiler.set_count('particles', self.blob_exit.particle_gen.get_particle_count())
+            profiler.set_count('blocks', len(self.block_group))
+            profiler.set_count('bonuses', len(self.bonuses))
+
+        # Everything has updated, move the animations on to the next frame
+        self.settings.animation_clock.advance()
+
+    def change_level(self):
+        """Move on to the next level, its platforms are normally built by now"""
+        # Timed on its own so the profiler shows the cost of the level change frame
+        profiler = self.settings.profiler
+        profiler.begin('update.level_change')
+        self.player.reset()
+        self.clear_enemies()
+        gf.generate_new_random_blob(self.settings, self.screen, self.settings.image_res.enemy_blob_images, self)
+        self.generate_platforms()
+        self.blob_exit.stop_gibbing()
+        self.level_info.increase_level()
+        self.levels_cleared += 1
+        self.settings.enemy_generation_rate = max(self.settings.enemy_generation_min_rate, 
+            self.settings.enemy_generation_rate - self.settings.enemy_generation_level_rate)
+        self.level_timer.reset()
+        profiler.end('update.level_change')
+
+    def get_state_checksum(self):
+        """A CRC of the simulation state (player, enemies, blocks, timer, level), two runs that
+        have stayed in step have the same checksum after every tick"""
+        player = self.player
+        state = [tuple(player.rect), float(player.dx), float(player.dy), player.falling, player.dying, player.air_jumps,
+            player.idle_top, player.won_level, len(self.block_group), self.block_grid.version, self.levels_cleared,
+            self.new_enemy_counter, self.settings.enemy_generation_rate, float(self.level_timer.elapsed_time_ms)]
+        # The engine's views hold numpy values, so normalize everything to plain python types
+        for enemy in self.enemies:
+            state.append((tuple(enemy.rect), float(enemy.dx), float(enemy.dy), bool(enemy.falling), bool(enemy.dying)))
+        return zlib.crc32(repr(state).encode())
 
-    def draw_tiles(self, draw_grid_overlay=False):
-        """Draws just the tile portion of the map"""
+    def invalidate_tile_layer(self):
+        """Throw away the pre-rendered tile layers, the next draw will rebuild them"""
+        self.tile_layers.clear()
+        self.tile_layer_key = None
+
+    def get_tile_layer_key(self):
+        """Everything the pre-rendered tile layer depends on, if this changes the layer is stale"""
+        return (self.layout_version, id(self.images), len(self.images), id(self.screen), self.screen.get_size(), self.x_offset)
+
+    def build_tile_layer(self, draw_grid_overlay=False):
+        """Render the tiles once onto a surface that can be blitted in a single call"""
         # Make the bottom of the map align with the bottom of the screen
-        number_of_rows = len(self.indicies) / self.settings.map_width
+        number_of_rows = len(self.indicies) // self.settings.map_width
         map_height = number_of_rows * self.settings.tile_height
+        map_width = self.settings.map_width * self.settings.tile_width
         y_offset = self.screen_rect.height - map_height
-        rect = pygame.Rect((self.x_offset, y_offset), (self.settings.tile_width, self.settings.tile_height))
+        self.tile_layer_rect = pygame.Rect((self.x_offset, y_offset), (map_width, map_height))
+
+        # Empty tiles must stay transparent since enemies are drawn below the tiles
+        layer = pygame.Surface((map_width, map_height))
+        layer.fill(self.settings.color_key)
+        layer.set_colorkey(self.settings.color_key)
+
+        rect = pygame.Rect((0, 0), (self.settings.tile_width, self.settings.tile_height))
         tiles_draw_per_row = 0
 
         # Loop through each row and render it, simple for now, map fits on the screen
         for index in self.indicies:
             if index >= 0:
-                self.screen.blit(self.images[index], rect)
+                layer.blit(self.images[index], rect)
                 if draw_grid_overlay:
                     color_red = (255, 0, 0)
-                    pygame.draw.rect(self.screen, color_red, rect, 1)
+                    pygame.draw.rect(layer, color_red, rect, 1)
             tiles_draw_per_row += 1
             rect.left += self.settings.tile_width
 
             # Every row worth of tiles, drop down one level and reset the x coord
             if tiles_draw_per_row == self.settings.map_width:
                 rect.top += self.settings.tile_height
-                rect.left = self.x_offset
+                rect.left = 0
                 tiles_draw_per_row = 0
 
-        # Draw the blocks
-        # This works because each block has 'image' member defined
-        self.block_group.draw(self.screen)
-    
-    def draw(self, draw_grid_overlay=False):
-        """Draws the tilemap."""
-        # Draw the enemies - can't use the Gorup method because of our animation logic
-        for enemy in self.enemies:
-            enemy.draw()
+        return layer
 
-        self.draw_tiles(draw_grid_overlay)
+    def get_tile_layer(self, draw_grid_overlay=False):
+        """Returns the pre-rendered tile layer, rebuilding it only if something it depends on changed"""
+        key = self.get_tile_layer_key()
+        if key != self.tile_layer_key:
+            self.invalidate_tile_layer()
+            self.tile_layer_key = key
+            self.screen_rect = self.screen.get_rect()
+
+        if draw_grid_overlay not in self.tile_layers:
+            self.tile_layers[draw_grid_overlay] = self.build_tile_layer(draw_grid_overlay)
+
+        return self.tile_layers[draw_grid_overlay]
 
+    def draw_tiles(self, draw_grid_overlay=False):
+        """Draws just the tile portion of the map"""
+        profiler = self.settings.profiler
+        profiler.begin('draw.tiles')
+        # The tiles only change when the map is regenerated, so blit the cached copy
+        self.screen.blit(self.get_tile_layer(draw_grid_overlay), self.tile_layer_rect)
+
+        # Draw the blocks, these are pre-rendered as well (see build_block_layer)
+        if self.block_layer:
+            self.screen.blit(self.block_layer, self.block_layer_rect)
+        profiler.end('draw.tiles')
+    
+    def draw_enemies(self):
+        """Draws the enemies, these sit below the tiles so they can fall behind the floor"""
+        profiler = self.settings.profiler
+        profiler.begin('draw.enemies')
+        # The engine draws all of its blobs in one batch
+        if self.blob_engine is not None:
+            self.blob_engine.draw()
+        else:
+            # Draw the enemies - can't use the Gorup method because of our animation logic
+            for enemy in self.enemies:
+                enemy.draw()
+        profiler.end('draw.enemies')
+
+    def draw_foreground(self):
+        """Draws everything that sits on top of the tiles (player, exit, HUD, bonuses)"""
+        profiler = self.settings.profiler
         # Draw the player
+        profiler.begin('draw.player')
         self.player.draw()
+        profiler.end('draw.player')
 
-        # Draw the exit
+        # Draw the exit (and its particles)
+        profiler.begin('draw.exit')
         self.blob_exit.draw()
+        profiler.end('draw.exit')
 
         # Draw the level info
+        profiler.begin('draw.hud')
         self.level_info.draw()
 
         # Draw the level timer
         self.level_timer.draw()
+        profiler.end('draw.hud')
 
         # Draw bonuses
+        profiler.begin('draw.bonuses')
         for bonus in self.bonuses:
-            bonus.draw(self.screen)
\ No newline at end of file
+            bonus.draw(self.screen)
+        profiler.end('draw.bonuses')
+
+    def draw(self, draw_grid_overlay=False):
+        """Draws the tilemap."""
+        self.draw_enemies()
+        self.draw_tiles(draw_grid_overlay)
+        self.draw_foreground()
\ No newline at end of file